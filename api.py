@@ -0,0 +1,220 @@
+"""
+Read-only JSON API for signups and lineups - runs next to the Streamlit app
+
+    uvicorn api:app --host 0.0.0.0 --port 8000
+
+Endpoints (GET/HEAD):
+    /games/active              active games
+    /games/{id}/signups        ordered signup list (no password hashes)
+    /games/{id}/teams          drawn lineups
+
+Responses are cached in-process for a few seconds and carry an ETag, so
+polling clients get "304 Not Modified" when nothing changed. The signups
+ETag is the game's signups_version plus its effective capacity (the
+capacity.default_max_players default can change without a new version),
+so revalidation costs one primary-key lookup. Unknown games get 404 and database errors 503; neither is cached.
+"""
+
+import re
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from src.database import get_db
+from src.game_config import get_config
+from src.utils.signup_utils import fetch_ranked_signups
+
+logger = logging.getLogger(__name__)
+
+# Seconds a response may be reused without touching the database
+CACHE_TTL = {
+    'active': 30,
+    'signups': 3,
+    'teams': 10,
+}
+
+# Most cached responses kept; least recently used ones are dropped first
+CACHE_MAX_ENTRIES = 1024
+
+GAME_ROUTE = re.compile(r"^/games/([0-9a-fA-F-]{36})/(signups|teams)/?$")
+
+
+class ResponseCache:
+    """Thread-safe TTL cache of (etag, body) per key, bounded in LRU order"""
+    
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return entry[1], entry[2]
+    
+    def put(self, key, ttl: float, etag: str, body: bytes):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+CACHE = ResponseCache()
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def encode(payload) -> bytes:
+    return json.dumps(payload, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def body_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+
+
+# Loaders query the database directly: the page helpers turn errors into
+# empty lists, which would be served (and cached) as valid responses.
+
+def load_active_games():
+    """(etag, body) of the active games list"""
+    games = get_db().execute_query("SELECT id, start_time FROM games WHERE active = TRUE ORDER BY start_time")
+    body = encode([
+        {'id': game['id'], 'start_time': game['start_time']}
+        for game in games
+    ])
+    return body_etag(body), body
+
+
+def load_signups(game_id: str):
+    """(etag, body) of a game's signups, or None if the game does not exist"""
+    db = get_db()
+    result = db.execute_query("SELECT signups_version, max_players FROM games WHERE id = %s", (game_id,))
+    if not result:
+        return None
+    version = result[0]['signups_version']
+    capacity = result[0]['max_players'] or get_config().default_max_players
+    
+    etag = f'"{game_id}-{version}-{capacity}"'
+    cached = CACHE.get(('signups-body', game_id))
+    if cached and cached[0] == etag:
+        return cached
+    
+    signups = fetch_ranked_signups(db, game_id)
+    body = encode({
+        'game_id': game_id,
+        'version': version,
+        'count': len(signups),
+        'capacity': signups[0]['capacity'] if signups else None,
+        'signups': [
+            {'position': signup['position'], 'nickname': signup['nickname'],
+             'timestamp': signup['timestamp'], 'reserve': signup['reserve']}
+            for signup in signups
+        ],
+    })
+    # Kept until the version changes (or evicted); the short TTL entry only skips the version check
+    CACHE.put(('signups-body', game_id), float('inf'), etag, body)
+    return etag, body
+
+
+def load_teams(game_id: str):
+    """(etag, body) of a game's lineups, or None if the game does not exist"""
+    # One round trip: the game row, plus its teams if any (team_color is NULL when none)
+    rows = get_db().execute_query("""
+        SELECT t.team_color, t.players
+        FROM games g
+        LEFT JOIN teams t ON t.game_id = g.id
+        WHERE g.id = %s
+    """, (game_id,))
+    if not rows:
+        return None
+    body = encode({
+        'game_id': game_id,
+        'teams': [{'color': row['team_color'], 'players': row['players']}
+                  for row in rows if row['team_color'] is not None],
+    })
+    return body_etag(body), body
+
+
+async def send_response(send, status: int, body: bytes = b"", etag: str = None, max_age: int = 0, head: bool = False):
+    headers = [
+        (b"content-type", b"application/json; charset=utf-8"),
+        (b"access-control-allow-origin", b"*"),
+        (b"cache-control", f"public, max-age={max_age}".encode()),
+    ]
+    if etag:
+        headers.append((b"etag", etag.encode()))
+    if status != 304:
+        headers.append((b"content-length", str(len(body)).encode()))
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': b"" if head or status == 304 else body})
+
+
+async def cached(key, ttl: int, loader, *args):
+    """Cached (etag, body), loading it in a worker thread when expired"""
+    entry = CACHE.get(key)
+    if entry is None:
+        entry = await asyncio.to_thread(loader, *args)
+        if entry is not None:
+            CACHE.put(key, ttl, *entry)
+    return entry
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    
+    if scope['type'] != 'http':
+        return
+    
+    method = scope['method']
+    if method not in ('GET', 'HEAD'):
+        await send_response(send, 405, encode({'error': 'method not allowed'}))
+        return
+    
+    path = scope['path']
+    try:
+        if path.rstrip('/') == '/games/active':
+            kind, entry = 'active', await cached(('active',), CACHE_TTL['active'], load_active_games)
+        else:
+            match = GAME_ROUTE.match(path)
+            if not match:
+                await send_response(send, 404, encode({'error': 'not found'}))
+                return
+            game_id, kind = match.group(1).lower(), match.group(2)
+            loader = load_signups if kind == 'signups' else load_teams
+            entry = await cached((kind, game_id), CACHE_TTL[kind], loader, game_id)
+    except Exception as e:
+        logger.error(f"Błąd bazy danych dla {path}: {e}")
+        await send_response(send, 503, encode({'error': 'database unavailable'}))
+        return
+    
+    if entry is None:
+        await send_response(send, 404, encode({'error': 'game not found'}))
+        return
+    
+    etag, body = entry
+    request_etags = dict(scope['headers']).get(b"if-none-match", b"").decode()
+    status = 304 if etag in [tag.strip() for tag in request_etags.split(",")] else 200
+    await send_response(send, status, body, etag, CACHE_TTL[kind], head=(method == 'HEAD'))
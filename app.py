@@ -1,11 +1,10 @@
 import streamlit as st
+from src import game_config
 from src.config import setup_page_config, init_database
+from src.page_profiler import profile_section
+from src.rerun import page_context
 from src.utils.datetime_utils import get_next_game_time
-from src.pages.signup import signup_page
-from src.pages.list_players import list_page
-from src.pages.draw_teams import draw_page
-from src.pages.history import history_page
-# from src.pages.payments import payments_page
+from src.warmup import load_page, start_warm_up
 
 
 @st.cache_data(ttl=300)  # Cache for 5 minutes
@@ -14,16 +13,22 @@ def get_cached_next_game_time():
     return get_next_game_time()
 
 
+def set_current_page(page: str):
+    """Navigation callback - runs before the rerun, so the new page renders at once"""
+    st.session_state.current_page = page
+
+
 def main():
     """Main application function"""
     # Page configuration
     setup_page_config()
     
-    st.title("⚽ Parkowa - Cotygodniowe Gierki")
-    
-    # Next game information in header (cached)
-    next_game_time = get_cached_next_game_time()
-    st.info(f"📅 **Najbliższa gierka:** {next_game_time.strftime('%d.%m.%Y %H:%M')}")
+    with profile_section("app", "nagłówek"):
+        st.title("⚽ Parkowa - Cotygodniowe Gierki")
+        
+        # Next game information in header (cached)
+        next_game_time = get_cached_next_game_time()
+        st.info(f"📅 **Najbliższa gierka:** {next_game_time.strftime('%d.%m.%Y %H:%M')}")
     
     st.markdown("---")
     
@@ -31,39 +36,62 @@ def main():
     if 'current_page' not in st.session_state:
         st.session_state.current_page = 'signup'
     
+    # Admin view is not advertised - opened with ?admin=1, password protected on the page,
+    # and hidden altogether when no treasurer password is configured
+    show_admin = 'admin' in st.query_params and bool(game_config.TREASURER_PASSWORD)
+    
     # Navigation buttons
-    col1, col2, col3, col4 = st.columns(4)
+    col1, col2, col3, col4, col5, *admin_col = st.columns(6 if show_admin else 5)
     
     with col1:
-        if st.button("📝 Zapisy", 
-                    key="nav_signup",
-                    width='stretch'):
-            st.session_state.current_page = 'signup'
+        st.button("📝 Zapisy", 
+                  key="nav_signup",
+                  width='stretch',
+                  on_click=set_current_page,
+                  args=('signup',))
     
     with col2:
-        if st.button("📋 Lista", 
-                    key="nav_list",
-                    width='stretch'):
-            st.session_state.current_page = 'list'
+        st.button("📋 Lista", 
+                  key="nav_list",
+                  width='stretch',
+                  on_click=set_current_page,
+                  args=('list',))
     
     with col3:
-        if st.button("🎲 Losowanie", 
-                    key="nav_draw",
-                    width='stretch'):
-            st.session_state.current_page = 'draw'
+        st.button("🎲 Losowanie", 
+                  key="nav_draw",
+                  width='stretch',
+                  on_click=set_current_page,
+                  args=('draw',))
     
     with col4:
-        if st.button("📚 Historia", 
-                    key="nav_history",
-                    width='stretch'):
-            st.session_state.current_page = 'history'
+        st.button("📚 Historia", 
+                  key="nav_history",
+                  width='stretch',
+                  on_click=set_current_page,
+                  args=('history',))
     
-    # with col5:
+    with col5:
+        st.button("📊 Statystyki", 
+                  key="nav_stats",
+                  width='stretch',
+                  on_click=set_current_page,
+                  args=('stats',))
+    
+    # with col6:
     #     if st.button("💰 Rozliczenia", 
     #                 key="nav_payments",
     #                 width='stretch'):
     #         st.session_state.current_page = 'payments'
     
+    if show_admin:
+        with admin_col[0]:
+            st.button("🛠️ Admin", 
+                      key="nav_admin",
+                      width='stretch',
+                      on_click=set_current_page,
+                      args=('admin',))
+    
     st.markdown("---")
     
     # Initialize Database (cached)
@@ -71,18 +99,21 @@ def main():
     if not db:
         st.error("Nie można połączyć się z bazą danych!")
         return
+    
+    # Warm up the remaining pages and caches once per process, in the background
+    # while this page renders
+    start_warm_up(db)
 
-    # Display selected page
-    if st.session_state.current_page == 'signup':
-        signup_page(db)
-    elif st.session_state.current_page == 'list':
-        list_page(db)
-    elif st.session_state.current_page == 'draw':
-        draw_page(db)
-    elif st.session_state.current_page == 'history':
-        history_page(db)
-    # elif st.session_state.current_page == 'payments':
-    #     payments_page(db)
+    # Display selected page (queries are tagged, counted and memoized per rerun; render is timed)
+    page = st.session_state.current_page
+    with page_context(f"{page}_page"):
+        # Page modules are imported on first use (see src/warmup.py)
+        if page in ('signup', 'list', 'draw', 'history', 'stats'):
+            load_page(page)(db)
+        elif page == 'admin' and show_admin:
+            load_page('admin')(db)
+        # elif page == 'payments':
+        #     load_page('payments')(db)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Cold-start import profile
+
+Runs `python -X importtime -c "import app"` in a fresh interpreter and
+prints the slowest modules by cumulative import time, so heavy imports
+creeping back into the startup path are easy to spot.
+
+Usage:
+    python -m benchmarks.import_profile            # top 25 modules
+    python -m benchmarks.import_profile --top 50 --module src.pages.history
+"""
+
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+
+def profile_imports(module: str) -> list:
+    """(cumulative_us, self_us, module name) for every module imported by `module`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "import failed")
+    
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import profile")
+    parser.add_argument("--module", default="app", help="module to import (default: app)")
+    parser.add_argument("--top", type=int, default=25, help="number of modules to show")
+    args = parser.parse_args()
+    
+    rows = profile_imports(args.module)
+    total = next((cumulative for cumulative, _, name in rows if name == args.module), 0)
+    print(f"import {args.module}: {total / 1000:.1f} ms")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative, self_us, name in sorted(rows, reverse=True)[:args.top]:
+        print(f"{cumulative / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
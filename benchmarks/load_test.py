@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Sunday-rush load test - simulates the crowd when signups open
+
+Runs N concurrent simulated users against a local PostgreSQL database using
+the real DB layer (add_signup, remove_signup, get_signups_for_game,
+get_active_games) and reports throughput, latency percentiles, connection
+counts and error/duplicate rates.
+
+Usage:
+    createdb parkowa_load
+    LOAD_TEST_DATABASE_URL=postgresql://localhost/parkowa_load \\
+        python -m benchmarks.load_test --users 60 --duration 30
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import random
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+class Recorder:
+    """Thread-safe collection of per-operation latencies and outcomes"""
+    
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.rejected = {}
+        self._lock = threading.Lock()
+    
+    def record(self, operation: str, seconds: float, ok: bool = True, error: bool = False):
+        with self._lock:
+            self.latencies.setdefault(operation, []).append(seconds)
+            if error:
+                self.errors[operation] = self.errors.get(operation, 0) + 1
+            elif not ok:
+                self.rejected[operation] = self.rejected.get(operation, 0) + 1
+
+
+class ConnectionMonitor(threading.Thread):
+    """Samples pg_stat_activity to track open connections during the run"""
+    
+    def __init__(self, connection_string: str, interval: float = 0.2):
+        super().__init__(name="connection-monitor", daemon=True)
+        self.connection_string = connection_string
+        self.interval = interval
+        self.samples = []
+        self._stopped = threading.Event()
+    
+    def run(self):
+        import psycopg2
+        connection = psycopg2.connect(self.connection_string, sslmode=os.getenv("DATABASE_SSLMODE", "disable"))
+        connection.autocommit = True
+        try:
+            with connection.cursor() as cur:
+                while not self._stopped.is_set():
+                    cur.execute("SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()")
+                    # Exclude the monitor's own connection
+                    self.samples.append(cur.fetchone()[0] - 1)
+                    self._stopped.wait(self.interval)
+        finally:
+            connection.close()
+    
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+def timed(recorder: Recorder, operation: str, func, *args):
+    """Call func, record its latency; func may return (success, message)"""
+    start = time.perf_counter()
+    try:
+        result = func(*args)
+    except Exception:
+        recorder.record(operation, time.perf_counter() - start, error=True)
+        return None
+    elapsed = time.perf_counter() - start
+    if isinstance(result, tuple):
+        success, message = result
+        recorder.record(operation, elapsed, ok=success, error=message.startswith("Błąd"))
+    else:
+        recorder.record(operation, elapsed)
+    return result
+
+
+def simulated_user(user_index: int, db, game_id: str, args, recorder: Recorder, deadline: float):
+    """One visitor: look at the list, sign up, refresh, sometimes sign out"""
+    from src.utils.game_utils import get_active_games
+    from src.utils.signup_utils import add_signup, remove_signup, get_signups_for_game
+    
+    # The app caches it for 60 s (st.cache_data, also outside a Streamlit server) -
+    # time the query itself, not cache hits
+    query_active_games = get_active_games.__wrapped__
+    
+    rng = random.Random(args.seed + user_index)
+    # Some users pick an already used nickname to exercise duplicate handling
+    if user_index > 0 and rng.random() < args.duplicate_ratio:
+        nickname = f"gracz{rng.randrange(user_index)}"
+    else:
+        nickname = f"gracz{user_index}"
+    password = f"haslo{user_index}"
+    
+    time.sleep(rng.uniform(0, args.ramp_up))
+    signed_up = False
+    while time.time() < deadline:
+        timed(recorder, "get_active_games", query_active_games, db)
+        timed(recorder, "get_signups_for_game", get_signups_for_game, db, game_id)
+        
+        if not signed_up:
+            result = timed(recorder, "add_signup", add_signup, db, game_id, nickname, password)
+            signed_up = bool(result and result[0])
+        elif rng.random() < args.signout_ratio:
+            result = timed(recorder, "remove_signup", remove_signup, db, game_id, nickname, password)
+            signed_up = not (result and result[0])
+        
+        time.sleep(rng.uniform(0, args.think_time))
+
+
+def setup_game(db) -> str:
+    """Create an active game for the run"""
+    game_id = str(uuid.uuid4())
+    db.execute_query(
+        "INSERT INTO games (id, start_time, active) VALUES (%s, %s, TRUE)",
+        (game_id, (datetime.now().astimezone() + timedelta(days=3)).isoformat())
+    )
+    return game_id
+
+
+def build_report(args, recorder: Recorder, monitor: ConnectionMonitor, elapsed: float, duplicates: int) -> dict:
+    """Summarize the run"""
+    operations = {}
+    total = 0
+    for operation, samples in sorted(recorder.latencies.items()):
+        total += len(samples)
+        operations[operation] = {
+            'count': len(samples),
+            'throughput_per_s': round(len(samples) / elapsed, 2),
+            'p50_ms': round(percentile(samples, 50) * 1000, 2),
+            'p95_ms': round(percentile(samples, 95) * 1000, 2),
+            'p99_ms': round(percentile(samples, 99) * 1000, 2),
+            'errors': recorder.errors.get(operation, 0),
+            'rejected': recorder.rejected.get(operation, 0),
+            'error_rate': round(recorder.errors.get(operation, 0) / len(samples), 4),
+        }
+    
+    samples = monitor.samples or [0]
+    return {
+        'users': args.users,
+        'duration_s': round(elapsed, 2),
+        'total_operations': total,
+        'throughput_per_s': round(total / elapsed, 2),
+        'connections': {
+            'peak': max(samples),
+            'mean': round(sum(samples) / len(samples), 2),
+        },
+        'duplicate_signups': duplicates,
+        'operations': operations,
+    }
+
+
+def print_report(report: dict):
+    """Human-readable report"""
+    print("=" * 78)
+    print(f"👥 Użytkownicy: {report['users']}   ⏱️ Czas: {report['duration_s']} s   "
+          f"🚀 {report['throughput_per_s']} op/s")
+    print(f"🔌 Połączenia: max {report['connections']['peak']}, średnio {report['connections']['mean']}")
+    print(f"👯 Zduplikowane zapisy: {report['duplicate_signups']}")
+    print("-" * 78)
+    print(f"{'operacja':<22}{'liczba':>8}{'op/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'błędy':>7}{'odrz.':>7}")
+    for operation, stats in report['operations'].items():
+        print(f"{operation:<22}{stats['count']:>8}{stats['throughput_per_s']:>9}{stats['p50_ms']:>9}"
+              f"{stats['p95_ms']:>9}{stats['p99_ms']:>9}{stats['errors']:>7}{stats['rejected']:>7}")
+    print("=" * 78)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sunday-rush load test against a local PostgreSQL")
+    parser.add_argument("--users", type=int, default=40, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=20.0, help="test duration in seconds")
+    parser.add_argument("--ramp-up", type=float, default=2.0, help="users start within this many seconds")
+    parser.add_argument("--think-time", type=float, default=1.0, help="max pause between a user's actions")
+    parser.add_argument("--signout-ratio", type=float, default=0.05, help="chance a signed-up user signs out per loop")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1, help="share of users reusing another nickname")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="keep the test game and signups")
+    parser.add_argument("--with-snapshots", action="store_true",
+                        help="also run the background snapshot refresher (into a temp dir)")
+    parser.add_argument("--json", help="also write the report to this JSON file")
+    args = parser.parse_args()
+    
+    database_url = os.getenv("LOAD_TEST_DATABASE_URL")
+    if not database_url:
+        sys.exit("❌ Ustaw LOAD_TEST_DATABASE_URL (lokalna baza PostgreSQL, nie produkcyjna!)")
+    
+    # The app's DB layer reads these
+    os.environ["SUPABASE_DATABASE_URL"] = database_url
+    os.environ.setdefault("DATABASE_SSLMODE", "disable")
+    
+    # Keep side effects out of the app's files and the report: snapshots go to a
+    # temp dir (their periodic refresh deletes files of games missing from this
+    # database) and security events to a temp file instead of stdout
+    work_dir = tempfile.mkdtemp(prefix="parkowa_load_")
+    os.environ["SNAPSHOT_DIR"] = os.path.join(work_dir, "snapshots")
+    os.environ["SECURITY_LOG_SINK"] = "file"
+    os.environ["SECURITY_LOG_PATH"] = os.path.join(work_dir, "security_events.jsonl")
+    
+    if not args.with_snapshots:
+        # The background refresher's queries would mix with the measured load
+        import src.utils.signup_utils as signup_utils
+        signup_utils.refresh_game_snapshot = lambda query, game_id: None
+    
+    import migrate
+    from src.database import SupabaseDB
+    
+    connection = migrate.get_database_connection()
+    migrate.ensure_migrations_table(connection)
+    for path in migrate.get_pending_migrations(migrate.get_applied_migrations(connection)):
+        migrate.apply_migration(connection, path)
+    connection.close()
+    
+    db = SupabaseDB()
+    game_id = setup_game(db)
+    recorder = Recorder()
+    monitor = ConnectionMonitor(database_url)
+    monitor.start()
+    
+    start = time.time()
+    deadline = start + args.duration
+    threads = [
+        threading.Thread(target=simulated_user, args=(i, db, game_id, args, recorder, deadline), daemon=True)
+        for i in range(args.users)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - start
+    monitor.stop()
+    
+    duplicates = db.execute_query(
+        "SELECT COALESCE(SUM(n - 1), 0) AS duplicates FROM "
+        "(SELECT COUNT(*) AS n FROM signups WHERE game_id = %s GROUP BY nickname) AS counts",
+        (game_id,)
+    )[0]['duplicates']
+    
+    report = build_report(args, recorder, monitor, elapsed, int(duplicates))
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+    
+    print(f"📁 Snapshoty i zdarzenia bezpieczeństwa: {work_dir}")
+    
+    if not args.keep:
+        db.execute_query("DELETE FROM signups WHERE game_id = %s", (game_id,))
+        db.execute_query("DELETE FROM games WHERE id = %s", (game_id,))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the pure hot-path functions
+
+Runs offline on synthetic data (no database, no Streamlit server) and
+writes a JSON report. Compare against a stored baseline to catch
+regressions before deploy; baselines are machine specific, so refresh
+them with --save-baseline on the machine that runs the comparison.
+
+Usage:
+    python -m benchmarks.microbench                       # run and compare with baseline
+    python -m benchmarks.microbench --save-baseline       # store a new baseline
+    python -m benchmarks.microbench --only draw --json out.json
+"""
+
+import sys
+import json
+import statistics
+import random
+import timeit
+import argparse
+import platform
+import importlib.util
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+BASELINE_FILE = Path(__file__).parent / "baseline.json"
+DEFAULT_REPEAT = 15
+DEFAULT_THRESHOLD = 0.25  # 25% slower than baseline counts as a regression...
+NOISE_SIGMAS = 3  # ...and also more than this many baseline standard deviations
+
+
+def load_normalize_players():
+    """The legacy lineup parser now lives in the jsonb migration"""
+    path = ROOT / "migrations" / "001_teams_players_jsonb.py"
+    spec = importlib.util.spec_from_file_location("teams_players_jsonb", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.normalize_players
+
+
+def synthetic_signups(count: int, rng: random.Random) -> list:
+    """Signup rows as returned by the driver"""
+    from src.constants import TIMEZONE
+    opened = datetime(2025, 3, 2, 10, 0, tzinfo=TIMEZONE)
+    return [
+        {
+            'nickname': f"gracz{i}",
+            'timestamp': opened + timedelta(seconds=i * rng.uniform(0.5, 30)),
+        }
+        for i in range(count)
+    ]
+
+
+def build_cases() -> dict:
+    """Name -> zero-argument callable"""
+    from src.constants import TIMEZONE
+    from src.utils.team_utils import draw_teams
+    from src.utils.security import validate_nickname, sanitize_input
+    from src.utils.datetime_utils import parse_game_time, parse_timestamp, get_next_game_time
+    from src.utils.signup_utils import signups_to_dataframe
+    
+    rng = random.Random(42)
+    normalize_players = load_normalize_players()
+    
+    roster_14 = [f"gracz{i}" for i in range(14)]
+    roster_18 = [f"gracz{i}" for i in range(18)]
+    large_roster = [f"gracz{i}" for i in range(500)]
+    
+    json_players = json.dumps(roster_18)
+    legacy_players = str(roster_18)
+    broken_legacy_players = "[" + ", ".join(f"'{p}" for p in roster_18) + "]"
+    
+    game_time_str = "2025-03-05T18:30:00+00:00"
+    game_time_dt = datetime(2025, 3, 5, 18, 30, tzinfo=TIMEZONE)
+    
+    signups_14 = synthetic_signups(14, rng)
+    signups_large = synthetic_signups(500, rng)
+    # Five years of weekly games with 16 players each
+    history = [synthetic_signups(16, rng) for _ in range(52 * 5)]
+    
+    messy_input = "   Kuba    z   Parkowej   " * 4
+    
+    return {
+        'draw_teams_14': lambda: draw_teams(list(roster_14), 14),
+        'draw_teams_18': lambda: draw_teams(list(roster_18), 18),
+        'draw_teams_unsupported_500': lambda: draw_teams(list(large_roster), 500),
+        'normalize_players_json': lambda: normalize_players(json_players),
+        'normalize_players_legacy': lambda: normalize_players(legacy_players),
+        'normalize_players_broken_legacy': lambda: normalize_players(broken_legacy_players),
+        'normalize_players_list': lambda: normalize_players(roster_18),
+        'validate_nickname_valid': lambda: validate_nickname("Kuba_Parkowa"),
+        'validate_nickname_invalid': lambda: validate_nickname("Kuba<script>"),
+        'sanitize_input': lambda: sanitize_input(messy_input),
+        'parse_game_time_str': lambda: parse_game_time(game_time_str),
+        'parse_game_time_datetime': lambda: parse_game_time(game_time_dt),
+        'parse_timestamp_str': lambda: parse_timestamp(game_time_str),
+        'get_next_game_time': get_next_game_time,
+        'signups_dataframe_14': lambda: signups_to_dataframe(signups_14),
+        'signups_dataframe_500': lambda: signups_to_dataframe(signups_large),
+        'signups_dataframe_history_5y': lambda: [signups_to_dataframe(s) for s in history],
+    }
+
+
+def measure(func, repeat: int) -> dict:
+    """Best per-call time over `repeat` runs of an auto-calibrated loop count (>= 0.2 s each),
+    with the runs' standard deviation as the noise estimate"""
+    timer = timeit.Timer(func)
+    loops, _ = timer.autorange()
+    per_call = [run / loops * 1e6 for run in timer.repeat(repeat=repeat, number=loops)]
+    return {
+        'per_call_us': round(min(per_call), 3),
+        'stdev_us': round(statistics.stdev(per_call), 3) if repeat > 1 else 0.0,
+        'loops': loops,
+        'repeat': repeat,
+    }
+
+
+def regression_limit(base: dict, threshold: float, sigmas: float = NOISE_SIGMAS) -> float:
+    """Slowest per-call time still accepted: above the threshold AND outside the baseline's noise"""
+    return max(base['per_call_us'] * (1 + threshold),
+               base['per_call_us'] + sigmas * base.get('stdev_us', 0.0))
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Names of cases slower than their regression_limit()"""
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        ratio = stats['per_call_us'] / base['per_call_us'] if base['per_call_us'] else 1.0
+        limit = regression_limit(base, threshold)
+        stats['baseline_us'] = base['per_call_us']
+        stats['limit_us'] = round(limit, 3)
+        stats['ratio'] = round(ratio, 3)
+        if stats['per_call_us'] > limit:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for hot-path functions")
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--baseline", default=str(BASELINE_FILE))
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--json", help="write the report to this JSON file")
+    args = parser.parse_args()
+    
+    cases = build_cases()
+    if args.only:
+        cases = {name: func for name, func in cases.items() if args.only in name}
+    
+    results = {}
+    for name, func in cases.items():
+        results[name] = measure(func, args.repeat)
+        print(f"{name:<34}{results[name]['per_call_us']:>14.3f} µs  ± {results[name]['stdev_us']:.3f}")
+    
+    report = {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+    
+    exit_code = 0
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2) + "\n", encoding='utf-8')
+        print(f"💾 Zapisano baseline: {baseline_path}")
+    elif baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text(encoding='utf-8'))['results']
+        regressions = compare(results, baseline, args.threshold)
+        report['regressions'] = regressions
+        if regressions:
+            print(f"❌ Regresje (> {args.threshold:.0%} i > {NOISE_SIGMAS}σ wolniej niż baseline): {', '.join(regressions)}")
+            exit_code = 1
+        else:
+            print("✅ Brak regresji względem baseline")
+    
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2) + "\n", encoding='utf-8')
+    
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,9 +11,8 @@ from datetime import datetime, timedelta
 import uuid
 import psycopg2
 from psycopg2.extras import RealDictCursor
-import yaml
-import pytz
-from pathlib import Path
+from src.constants import TIMEZONE
+from src.game_config import get_config, ConfigError
 
 # Logging configuration
 logging.basicConfig(
@@ -26,35 +25,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Configuration - load from YAML file directly
+# Configuration - the same validated config object as the Streamlit app
 def load_scheduler_config():
-    """Load configuration from YAML file for scheduler"""
-    config_file = Path(__file__).parent / "game_consts.yaml"
+    """Load the shared game configuration (src/game_config.py)"""
     try:
-        with open(config_file, 'r', encoding='utf-8') as file:
-            config = yaml.safe_load(file)
-            return {
-                'TIMEZONE': pytz.timezone('Europe/Warsaw'),
-                'GAME_DAY': config['game']['day'],
-                'GAME_START_HOUR': config['game']['hour'],
-                'GAME_START_MINUTE': config['game']['minute'],
-                'SIGNUP_OPEN_DAY': config['signup']['day'],
-                'SIGNUP_OPEN_HOUR': config['signup']['hour'],
-                'SIGNUP_OPEN_MINUTE': config['signup']['minute']
-            }
-    except Exception as e:
+        return get_config()
+    except ConfigError as e:
         logger.error(f"Błąd wczytywania konfiguracji: {e}")
         sys.exit(1)
 
 # Load config
 CONFIG = load_scheduler_config()
-TIMEZONE = CONFIG['TIMEZONE']
-GAME_DAY = CONFIG['GAME_DAY']
-GAME_START_HOUR = CONFIG['GAME_START_HOUR']
-GAME_START_MINUTE = CONFIG['GAME_START_MINUTE']
-SIGNUP_OPEN_DAY = CONFIG['SIGNUP_OPEN_DAY']
-SIGNUP_OPEN_HOUR = CONFIG['SIGNUP_OPEN_HOUR']
-SIGNUP_OPEN_MINUTE = CONFIG['SIGNUP_OPEN_MINUTE']
+GAME_DAY = CONFIG.game.day
+GAME_START_HOUR = CONFIG.game.hour
+GAME_START_MINUTE = CONFIG.game.minute
+SIGNUP_OPEN_DAY = CONFIG.signup.day
+SIGNUP_OPEN_HOUR = CONFIG.signup.hour
+SIGNUP_OPEN_MINUTE = CONFIG.signup.minute
 
 
 def get_next_game_time():
@@ -176,6 +163,12 @@ def deactivate_past_games(connection) -> int:
         if deactivated_count == 0:
             logger.info("✅ Brak przeszłych gierek do dezaktywacji")
         
+        # Charge closed games whose start time has passed - also ones deactivated earlier
+        charge_past_games(connection)
+        
+        # Add closed games to the player statistics (also catches up earlier misses)
+        update_player_stats(connection)
+        
         return deactivated_count
         
     except Exception as e:
@@ -183,6 +176,68 @@ def deactivate_past_games(connection) -> int:
         raise
 
 
+def charge_past_games(connection) -> int:
+    """Post unpaid signups of closed, already started games to the debtor ledger
+
+    Setting games.charged fires the ledger trigger (migrations/011_games_charged.sql).
+    """
+    charged = execute_query(
+        connection,
+        "UPDATE games SET charged = TRUE WHERE NOT active AND NOT charged AND start_time <= now()"
+    )
+    if charged:
+        logger.info(f"💰 Naliczono opłaty za {charged} gierek")
+    return charged
+
+
+def update_player_stats(connection) -> int:
+    """Apply closed games not yet counted to the player statistics, oldest first"""
+    pending = execute_query(
+        connection,
+        "SELECT id FROM games WHERE NOT active AND NOT stats_applied AND start_time <= now() ORDER BY start_time"
+    )
+    
+    applied_count = 0
+    for game in pending:
+        try:
+            with connection.cursor() as cur:
+                # One transaction per game (see migrations/008_player_stats.sql)
+                cur.execute("SELECT apply_game_stats(%s, %s) AS applied", (game['id'], CONFIG.default_max_players))
+                applied = cur.fetchone()['applied']
+            connection.commit()
+            applied_count += 1 if applied else 0
+        except Exception as e:
+            connection.rollback()
+            logger.error(f"❌ Błąd aktualizacji statystyk gierki {str(game['id'])[:8]}...: {e}")
+            break  # later games must not be applied before this one (streaks)
+    
+    if applied_count:
+        logger.info(f"📊 Zaktualizowano statystyki graczy o {applied_count} gierek")
+    return applied_count
+
+
+def archive_old_games(connection) -> int:
+    """Move signups and lineups of old closed games to the archive tables"""
+    if not CONFIG.archive_after_days:
+        return 0
+    
+    try:
+        with connection.cursor() as cur:
+            cur.execute(
+                "SELECT archive_games(now() - make_interval(days => %s)) AS archived",
+                (CONFIG.archive_after_days,)
+            )
+            archived = cur.fetchone()['archived']
+        connection.commit()
+        if archived:
+            logger.info(f"🗄️ Zarchiwizowano {archived} gierek starszych niż {CONFIG.archive_after_days} dni")
+        return archived
+    except Exception as e:
+        connection.rollback()
+        logger.error(f"❌ Błąd archiwizacji gierek: {e}")
+        return 0
+
+
 def create_upcoming_games(connection) -> int:
     """Create games for next week"""
     logger.info("🏗️ Sprawdzanie czy potrzeba utworzyć nowe gierki...")
@@ -233,6 +288,19 @@ def create_game_for_week(connection, weeks_ahead: int) -> bool:
         return False
 
 
+def refresh_static_snapshots(connection) -> int:
+    """Regenerate static list snapshots of active games in SNAPSHOT_DIR"""
+    from src.utils.snapshots import refresh_snapshots
+    
+    try:
+        count = refresh_snapshots(lambda query, params=None: execute_query(connection, query, params))
+        logger.info(f"🗂️ Odświeżono snapshoty {count} aktywnych gierek")
+        return count
+    except Exception as e:
+        logger.error(f"❌ Błąd odświeżania snapshotów: {e}")
+        return 0
+
+
 def get_scheduler_stats(connection) -> dict:
     """Get current scheduler statistics"""
     try:
@@ -285,12 +353,20 @@ def main():
         # Deactivate past games
         deactivated = deactivate_past_games(connection)
         
+        # Archive old games (after their statistics were updated above)
+        archive_old_games(connection)
+        
         # Create new games
         created = create_upcoming_games(connection)
         
         # Activate games for which it's time for signups (after creating new ones)
         activated = activate_games_for_signup(connection)
         
+        # Static snapshots of active games - only when SNAPSHOT_DIR is set, i.e. the scheduler
+        # runs on the host serving it; otherwise the app's background refresher keeps them current
+        if os.getenv('SNAPSHOT_DIR'):
+            refresh_static_snapshots(connection)
+        
         # Final statistics
         final_stats = get_scheduler_stats(connection)
         
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Game history export/import (Parquet) - independent from Streamlit UI
+
+Usage:
+    python history_io.py export backup/            # games, signups, teams, payments -> backup/*.parquet
+    python history_io.py import backup/            # load into another database (existing rows are kept)
+
+Uses SUPABASE_DATABASE_URL like migrate.py. Rows are streamed in chunks of
+EXPORT_CHUNK_ROWS (or --chunk-rows), so memory does not grow with history size.
+"""
+
+import sys
+import logging
+import argparse
+from pathlib import Path
+from migrate import get_database_connection
+from src.game_config import get_config
+from src.utils.parquet_history import CHUNK_ROWS, cursor_chunks, export_history, import_history
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Main export/import function"""
+    parser = argparse.ArgumentParser(description="Eksport/import historii gierek (Parquet)")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows per chunk / row group")
+    args = parser.parse_args()
+    
+    try:
+        connection = get_database_connection()
+        
+        if args.command == "export":
+            # One consistent snapshot of all tables
+            connection.set_session(isolation_level='REPEATABLE READ', readonly=True)
+            counts = export_history(
+                lambda query, chunk_rows: cursor_chunks(connection, query, chunk_rows=chunk_rows),
+                args.directory,
+                chunk_rows=args.chunk_rows
+            )
+            connection.rollback()
+            logger.info(f"✅ Wyeksportowano do {args.directory}: {counts}")
+        else:
+            counts = import_history(
+                connection, args.directory,
+                default_capacity=get_config().default_max_players,
+                chunk_rows=args.chunk_rows
+            )
+            logger.info(f"✅ Zaimportowano z {args.directory}: {counts}")
+        
+        connection.close()
+    
+    except Exception as e:
+        logger.error(f"💥 Błąd {'eksportu' if args.command == 'export' else 'importu'}: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Database migrations runner - independent from Streamlit UI
+Applies pending migrations from the migrations/ directory in order
+"""
+
+import os
+import sys
+import logging
+import importlib.util
+import psycopg2
+from psycopg2.extras import RealDictCursor
+from pathlib import Path
+
+# Logging configuration
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+
+def get_database_connection():
+    """Get database connection from environment"""
+    database_url = os.getenv('SUPABASE_DATABASE_URL')
+
+    if not database_url:
+        raise ValueError("❌ Brak zmiennej SUPABASE_DATABASE_URL")
+
+    logger.info("✅ Łączenie z Supabase PostgreSQL...")
+    return psycopg2.connect(
+        database_url,
+        cursor_factory=RealDictCursor,
+        sslmode=os.getenv('DATABASE_SSLMODE', 'require')
+    )
+
+
+def ensure_migrations_table(connection):
+    """Create the table that records applied migrations"""
+    with connection.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                name TEXT PRIMARY KEY,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+        """)
+    connection.commit()
+
+
+def get_applied_migrations(connection) -> set:
+    """Names of migrations that were already applied"""
+    with connection.cursor() as cur:
+        cur.execute("SELECT name FROM schema_migrations")
+        return {row['name'] for row in cur.fetchall()}
+
+
+def get_pending_migrations(applied: set) -> list:
+    """Migration files (.sql or .py) not applied yet, in name order"""
+    files = sorted(
+        path for path in MIGRATIONS_DIR.iterdir()
+        if path.suffix in ('.sql', '.py') and not path.name.startswith('_')
+    )
+    return [path for path in files if path.name not in applied]
+
+
+def apply_migration(connection, path: Path):
+    """Apply a single migration and record it in one transaction"""
+    try:
+        if path.suffix == '.sql':
+            with connection.cursor() as cur:
+                cur.execute(path.read_text(encoding='utf-8'))
+        else:
+            # Python migrations expose upgrade(connection) and must not commit
+            spec = importlib.util.spec_from_file_location(path.stem, path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            module.upgrade(connection)
+
+        with connection.cursor() as cur:
+            cur.execute("INSERT INTO schema_migrations (name) VALUES (%s)", (path.name,))
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+
+
+def main():
+    """Main migrations function"""
+    try:
+        connection = get_database_connection()
+        ensure_migrations_table(connection)
+
+        pending = get_pending_migrations(get_applied_migrations(connection))
+        if not pending:
+            logger.info("✅ Brak migracji do wykonania")
+
+        for path in pending:
+            logger.info(f"🏗️ Wykonywanie migracji {path.name}...")
+            apply_migration(connection, path)
+            logger.info(f"✅ Zakończono migrację {path.name}")
+
+        connection.close()
+
+    except Exception as e:
+        logger.error(f"💥 Błąd migracji: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
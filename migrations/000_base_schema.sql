@@ -0,0 +1,24 @@
+-- Base tables used by the app and the scheduler (no-op on existing databases)
+
+CREATE TABLE IF NOT EXISTS games (
+    id UUID PRIMARY KEY,
+    start_time TIMESTAMPTZ NOT NULL,
+    active BOOLEAN NOT NULL DEFAULT FALSE
+);
+
+CREATE TABLE IF NOT EXISTS signups (
+    id UUID PRIMARY KEY,
+    game_id UUID NOT NULL REFERENCES games (id) ON DELETE CASCADE,
+    nickname TEXT NOT NULL,
+    password_hash TEXT NOT NULL,
+    timestamp TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS signups_game_id_idx ON signups (game_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS teams (
+    id UUID PRIMARY KEY,
+    game_id UUID NOT NULL REFERENCES games (id) ON DELETE CASCADE,
+    team_color TEXT NOT NULL,
+    players TEXT
+);
@@ -0,0 +1,78 @@
+"""
+Convert teams.players to jsonb arrays of nicknames
+
+Older rows hold JSON strings, Python-like list strings or plain text.
+They are normalized once here so reads never need to parse them again.
+"""
+
+import json
+import ast
+from psycopg2.extras import Json, execute_values
+
+
+def normalize_players(players_value):
+    """Normalizes various legacy DB formats into a list of player nicknames."""
+    if players_value is None:
+        return []
+
+    if isinstance(players_value, (list, tuple)):
+        return [str(player) for player in players_value if player is not None]
+
+    if isinstance(players_value, str):
+        players_str = players_value.strip()
+        if not players_str:
+            return []
+
+        # Preferred format: JSON array string.
+        try:
+            parsed = json.loads(players_str)
+            if isinstance(parsed, list):
+                return [str(player) for player in parsed if player is not None]
+            if isinstance(parsed, str):
+                return [parsed] if parsed else []
+        except json.JSONDecodeError:
+            pass
+
+        # Legacy format: Python-like list string "['name1', 'name2']".
+        if players_str.startswith("[") and players_str.endswith("]"):
+            try:
+                parsed = ast.literal_eval(players_str)
+                if isinstance(parsed, list):
+                    return [str(player) for player in parsed if player is not None]
+                return [str(parsed)] if parsed is not None else []
+            except Exception:
+                return [
+                    p.strip(" '\"[]")
+                    for p in players_str.split(",")
+                    if p.strip(" '\"[]")
+                ]
+
+        # Single nickname saved as plain text.
+        return [players_str]
+
+    # Fallback for unexpected types.
+    return [str(players_value)]
+
+
+def upgrade(connection):
+    """Rewrite every lineup as a jsonb array and swap the column type"""
+    with connection.cursor() as cur:
+        cur.execute("SELECT id, players FROM teams")
+        rows = [(str(row['id']), Json(normalize_players(row['players']))) for row in cur.fetchall()]
+
+        cur.execute("ALTER TABLE teams ADD COLUMN players_jsonb JSONB NOT NULL DEFAULT '[]'::jsonb")
+        if rows:
+            execute_values(
+                cur,
+                "UPDATE teams SET players_jsonb = v.players::jsonb "
+                "FROM (VALUES %s) AS v(id, players) WHERE teams.id::text = v.id::text",
+                rows
+            )
+
+        cur.execute("ALTER TABLE teams DROP COLUMN players")
+        cur.execute("ALTER TABLE teams RENAME COLUMN players_jsonb TO players")
+        cur.execute("ALTER TABLE teams ALTER COLUMN players DROP DEFAULT")
+        cur.execute(
+            "ALTER TABLE teams ADD CONSTRAINT teams_players_is_array "
+            "CHECK (jsonb_typeof(players) = 'array')"
+        )
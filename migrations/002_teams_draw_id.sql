@@ -0,0 +1,13 @@
+-- One row per (game, team color) and a draw tag shared by all teams of a lineup
+
+ALTER TABLE teams ADD COLUMN IF NOT EXISTS draw_id UUID;
+ALTER TABLE teams ADD COLUMN IF NOT EXISTS drawn_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+-- Drop duplicates left by interleaved redraws before enforcing uniqueness
+DELETE FROM teams a
+USING teams b
+WHERE a.game_id = b.game_id
+  AND a.team_color = b.team_color
+  AND a.ctid < b.ctid;
+
+CREATE UNIQUE INDEX IF NOT EXISTS teams_game_color_key ON teams (game_id, team_color);
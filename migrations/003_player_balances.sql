@@ -0,0 +1,118 @@
+-- Per-player debtor ledger maintained incrementally by triggers
+--
+-- A signup counts towards a balance when it is unpaid (paid IS FALSE) and its
+-- game is closed (active = FALSE and start_time <= now() when the row changes).
+-- The scheduler closes games by flipping games.active, which fires the trigger.
+
+ALTER TABLE signups ADD COLUMN IF NOT EXISTS paid BOOLEAN DEFAULT FALSE;
+ALTER TABLE games ADD COLUMN IF NOT EXISTS cost_per_player NUMERIC(8, 2) NOT NULL DEFAULT 0;
+
+CREATE TABLE IF NOT EXISTS player_balances (
+    nickname TEXT PRIMARY KEY,
+    unpaid_games INTEGER NOT NULL DEFAULT 0,
+    amount_due NUMERIC(10, 2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS player_balances_debtors_idx
+    ON player_balances (unpaid_games DESC)
+    WHERE unpaid_games > 0;
+
+CREATE OR REPLACE FUNCTION apply_player_balance(p_nickname TEXT, p_games INTEGER, p_amount NUMERIC)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO player_balances AS b (nickname, unpaid_games, amount_due)
+    VALUES (p_nickname, p_games, p_amount)
+    ON CONFLICT (nickname) DO UPDATE
+    SET unpaid_games = b.unpaid_games + EXCLUDED.unpaid_games,
+        amount_due = b.amount_due + EXCLUDED.amount_due,
+        updated_at = now();
+END;
+$$ LANGUAGE plpgsql;
+
+-- Signup inserted, deleted, or its paid flag / nickname / game changed
+CREATE OR REPLACE FUNCTION signups_balance_trigger()
+RETURNS TRIGGER AS $$
+DECLARE
+    g games%ROWTYPE;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.paid IS FALSE THEN
+        SELECT * INTO g FROM games WHERE id = OLD.game_id;
+        IF FOUND AND NOT g.active AND g.start_time <= now() THEN
+            PERFORM apply_player_balance(OLD.nickname, -1, -g.cost_per_player);
+        END IF;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.paid IS FALSE THEN
+        SELECT * INTO g FROM games WHERE id = NEW.game_id;
+        IF FOUND AND NOT g.active AND g.start_time <= now() THEN
+            PERFORM apply_player_balance(NEW.nickname, 1, g.cost_per_player);
+        END IF;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS signups_balance ON signups;
+CREATE TRIGGER signups_balance
+    AFTER INSERT OR DELETE OR UPDATE OF paid, nickname, game_id ON signups
+    FOR EACH ROW EXECUTE FUNCTION signups_balance_trigger();
+
+-- Game closed/reopened, its cost changed, or it is being deleted
+CREATE OR REPLACE FUNCTION games_balance_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NOT OLD.active AND OLD.start_time <= now() THEN
+        PERFORM apply_player_balance(s.nickname, -COUNT(*)::INTEGER, -COUNT(*) * OLD.cost_per_player)
+        FROM signups s
+        WHERE s.game_id = OLD.id AND s.paid IS FALSE
+        GROUP BY s.nickname;
+    END IF;
+
+    IF TG_OP = 'UPDATE' THEN
+        IF NOT NEW.active AND NEW.start_time <= now() THEN
+            PERFORM apply_player_balance(s.nickname, COUNT(*)::INTEGER, COUNT(*) * NEW.cost_per_player)
+            FROM signups s
+            WHERE s.game_id = NEW.id AND s.paid IS FALSE
+            GROUP BY s.nickname;
+        END IF;
+        RETURN NEW;
+    END IF;
+
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS games_balance_update ON games;
+CREATE TRIGGER games_balance_update
+    AFTER UPDATE OF active, start_time, cost_per_player ON games
+    FOR EACH ROW
+    WHEN (OLD.active IS DISTINCT FROM NEW.active
+          OR OLD.start_time IS DISTINCT FROM NEW.start_time
+          OR OLD.cost_per_player IS DISTINCT FROM NEW.cost_per_player)
+    EXECUTE FUNCTION games_balance_trigger();
+
+-- BEFORE DELETE so the game's signups are still visible
+DROP TRIGGER IF EXISTS games_balance_delete ON games;
+CREATE TRIGGER games_balance_delete
+    BEFORE DELETE ON games
+    FOR EACH ROW EXECUTE FUNCTION games_balance_trigger();
+
+-- Full recomputation, used for the backfill and to repair drift
+CREATE OR REPLACE FUNCTION rebuild_player_balances()
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM player_balances;
+    INSERT INTO player_balances (nickname, unpaid_games, amount_due)
+    SELECT s.nickname, COUNT(*), COALESCE(SUM(g.cost_per_player), 0)
+    FROM signups s
+    JOIN games g ON s.game_id = g.id
+    WHERE s.paid IS FALSE
+      AND NOT g.active
+      AND g.start_time <= now()
+    GROUP BY s.nickname;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT rebuild_player_balances();
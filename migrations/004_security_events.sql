@@ -0,0 +1,12 @@
+-- Security/application events written in batches by src/utils/event_log.py
+
+CREATE TABLE IF NOT EXISTS security_events (
+    id BIGSERIAL PRIMARY KEY,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    event_type TEXT NOT NULL,
+    details TEXT,
+    sample_rate REAL NOT NULL DEFAULT 1
+);
+
+CREATE INDEX IF NOT EXISTS security_events_created_at_idx ON security_events (created_at);
+CREATE INDEX IF NOT EXISTS security_events_type_idx ON security_events (event_type, created_at);
@@ -0,0 +1,25 @@
+-- Per-game counter bumped on every change to the game's signup list,
+-- so clients can check "has this list changed" with a primary-key lookup
+
+ALTER TABLE games ADD COLUMN IF NOT EXISTS signups_version BIGINT NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION bump_signups_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE games SET signups_version = signups_version + 1 WHERE id = OLD.game_id;
+    END IF;
+
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.game_id IS DISTINCT FROM OLD.game_id) THEN
+        UPDATE games SET signups_version = signups_version + 1 WHERE id = NEW.game_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Payment flag changes do not affect the list, so only these columns count
+DROP TRIGGER IF EXISTS signups_version ON signups;
+CREATE TRIGGER signups_version
+    AFTER INSERT OR DELETE OR UPDATE OF nickname, game_id, timestamp ON signups
+    FOR EACH ROW EXECUTE FUNCTION bump_signups_version();
@@ -0,0 +1,9 @@
+-- Per-game signup limit. Signups beyond it form the reserve list; positions
+-- are computed with ROW_NUMBER() over timestamp, so a freed main-squad place
+-- goes to the first reserve without any stored state.
+-- NULL = default from game_consts.yaml (capacity.default_max_players)
+
+ALTER TABLE games ADD COLUMN IF NOT EXISTS max_players INTEGER;
+
+ALTER TABLE games DROP CONSTRAINT IF EXISTS games_max_players_positive;
+ALTER TABLE games ADD CONSTRAINT games_max_players_positive CHECK (max_players IS NULL OR max_players > 0);
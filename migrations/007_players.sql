@@ -0,0 +1,169 @@
+-- Player registry: one row per person, signups reference it by id
+--
+-- Nicknames are matched case- and whitespace-insensitively ("Kuba", " kuba ")
+-- through normalize_nickname(). A BEFORE trigger fills signups.player_id from
+-- the nickname, so writers only need to insert the nickname as before.
+-- The debtor ledger (003) is re-keyed from nickname to player_id.
+
+CREATE OR REPLACE FUNCTION normalize_nickname(p_nickname TEXT)
+RETURNS TEXT AS $$
+    SELECT lower(regexp_replace(btrim(p_nickname), '\s+', ' ', 'g'));
+$$ LANGUAGE sql IMMUTABLE STRICT;
+
+CREATE TABLE IF NOT EXISTS players (
+    id BIGSERIAL PRIMARY KEY,
+    nickname TEXT NOT NULL,  -- display form, as first signed up
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS players_nickname_key ON players (normalize_nickname(nickname));
+
+-- Id of the player with this nickname, registering them if new
+CREATE OR REPLACE FUNCTION player_id_for(p_nickname TEXT)
+RETURNS BIGINT AS $$
+DECLARE
+    v_id BIGINT;
+BEGIN
+    SELECT id INTO v_id FROM players WHERE normalize_nickname(nickname) = normalize_nickname(p_nickname);
+    IF v_id IS NULL THEN
+        INSERT INTO players (nickname) VALUES (btrim(p_nickname))
+        ON CONFLICT (normalize_nickname(nickname)) DO NOTHING
+        RETURNING id INTO v_id;
+    END IF;
+    IF v_id IS NULL THEN
+        -- Registered concurrently
+        SELECT id INTO v_id FROM players WHERE normalize_nickname(nickname) = normalize_nickname(p_nickname);
+    END IF;
+    RETURN v_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ===== BACKFILL =====
+ALTER TABLE signups ADD COLUMN IF NOT EXISTS player_id BIGINT REFERENCES players (id);
+
+INSERT INTO players (nickname, created_at)
+SELECT DISTINCT ON (normalize_nickname(nickname)) btrim(nickname), timestamp
+FROM signups
+ORDER BY normalize_nickname(nickname), timestamp
+ON CONFLICT (normalize_nickname(nickname)) DO NOTHING;
+
+UPDATE signups s
+SET player_id = p.id
+FROM players p
+WHERE s.player_id IS NULL
+  AND normalize_nickname(p.nickname) = normalize_nickname(s.nickname);
+
+ALTER TABLE signups ALTER COLUMN player_id SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS signups_player_id_idx ON signups (player_id);
+
+CREATE OR REPLACE FUNCTION signups_player_id_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.player_id IS NULL OR TG_OP = 'UPDATE' THEN
+        NEW.player_id := player_id_for(NEW.nickname);
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS signups_player_id ON signups;
+CREATE TRIGGER signups_player_id
+    BEFORE INSERT OR UPDATE OF nickname ON signups
+    FOR EACH ROW EXECUTE FUNCTION signups_player_id_trigger();
+
+-- ===== DEBTOR LEDGER KEYED BY PLAYER =====
+DROP TABLE IF EXISTS player_balances;
+DROP FUNCTION IF EXISTS apply_player_balance(TEXT, INTEGER, NUMERIC);
+
+CREATE TABLE player_balances (
+    player_id BIGINT PRIMARY KEY REFERENCES players (id) ON DELETE CASCADE,
+    unpaid_games INTEGER NOT NULL DEFAULT 0,
+    amount_due NUMERIC(10, 2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX player_balances_debtors_idx
+    ON player_balances (unpaid_games DESC)
+    WHERE unpaid_games > 0;
+
+CREATE OR REPLACE FUNCTION apply_player_balance(p_player_id BIGINT, p_games INTEGER, p_amount NUMERIC)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO player_balances AS b (player_id, unpaid_games, amount_due)
+    VALUES (p_player_id, p_games, p_amount)
+    ON CONFLICT (player_id) DO UPDATE
+    SET unpaid_games = b.unpaid_games + EXCLUDED.unpaid_games,
+        amount_due = b.amount_due + EXCLUDED.amount_due,
+        updated_at = now();
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION signups_balance_trigger()
+RETURNS TRIGGER AS $$
+DECLARE
+    g games%ROWTYPE;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.paid IS FALSE THEN
+        SELECT * INTO g FROM games WHERE id = OLD.game_id;
+        IF FOUND AND NOT g.active AND g.start_time <= now() THEN
+            PERFORM apply_player_balance(OLD.player_id, -1, -g.cost_per_player);
+        END IF;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.paid IS FALSE THEN
+        SELECT * INTO g FROM games WHERE id = NEW.game_id;
+        IF FOUND AND NOT g.active AND g.start_time <= now() THEN
+            PERFORM apply_player_balance(NEW.player_id, 1, g.cost_per_player);
+        END IF;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS signups_balance ON signups;
+CREATE TRIGGER signups_balance
+    AFTER INSERT OR DELETE OR UPDATE OF paid, nickname, player_id, game_id ON signups
+    FOR EACH ROW EXECUTE FUNCTION signups_balance_trigger();
+
+CREATE OR REPLACE FUNCTION games_balance_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NOT OLD.active AND OLD.start_time <= now() THEN
+        PERFORM apply_player_balance(s.player_id, -COUNT(*)::INTEGER, -COUNT(*) * OLD.cost_per_player)
+        FROM signups s
+        WHERE s.game_id = OLD.id AND s.paid IS FALSE
+        GROUP BY s.player_id;
+    END IF;
+
+    IF TG_OP = 'UPDATE' THEN
+        IF NOT NEW.active AND NEW.start_time <= now() THEN
+            PERFORM apply_player_balance(s.player_id, COUNT(*)::INTEGER, COUNT(*) * NEW.cost_per_player)
+            FROM signups s
+            WHERE s.game_id = NEW.id AND s.paid IS FALSE
+            GROUP BY s.player_id;
+        END IF;
+        RETURN NEW;
+    END IF;
+
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rebuild_player_balances()
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM player_balances;
+    INSERT INTO player_balances (player_id, unpaid_games, amount_due)
+    SELECT s.player_id, COUNT(*), COALESCE(SUM(g.cost_per_player), 0)
+    FROM signups s
+    JOIN games g ON s.game_id = g.id
+    WHERE s.paid IS FALSE
+      AND NOT g.active
+      AND g.start_time <= now()
+    GROUP BY s.player_id;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT rebuild_player_balances();
@@ -0,0 +1,126 @@
+-- Per-player statistics kept in summary tables
+--
+-- apply_game_stats() adds one closed game's contribution (attendance,
+-- streaks, teammates) and marks it in games.stats_applied; the scheduler
+-- calls it for closed games in start_time order. The stats page reads the
+-- tables directly. rebuild_player_stats() recomputes everything.
+--
+-- Attendance = the game's main squad (first max_players signups, or the
+-- given default capacity; all signups when neither is set).
+
+ALTER TABLE games ADD COLUMN IF NOT EXISTS stats_applied BOOLEAN NOT NULL DEFAULT FALSE;
+
+CREATE INDEX IF NOT EXISTS games_stats_pending_idx
+    ON games (start_time)
+    WHERE NOT active AND NOT stats_applied;
+
+CREATE TABLE IF NOT EXISTS player_stats (
+    player_id BIGINT PRIMARY KEY REFERENCES players (id) ON DELETE CASCADE,
+    games_played INTEGER NOT NULL DEFAULT 0,
+    current_streak INTEGER NOT NULL DEFAULT 0,  -- consecutive games up to the latest one
+    longest_streak INTEGER NOT NULL DEFAULT 0,
+    first_played_at TIMESTAMPTZ,
+    last_played_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS player_stats_games_played_idx ON player_stats (games_played DESC);
+
+CREATE TABLE IF NOT EXISTS player_teammates (
+    player_id BIGINT NOT NULL REFERENCES players (id) ON DELETE CASCADE,
+    teammate_id BIGINT NOT NULL REFERENCES players (id) ON DELETE CASCADE,
+    games_together INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (player_id, teammate_id)
+);
+
+CREATE INDEX IF NOT EXISTS player_teammates_top_idx ON player_teammates (player_id, games_together DESC);
+
+CREATE OR REPLACE FUNCTION apply_game_stats(p_game_id UUID, p_default_capacity INTEGER DEFAULT NULL)
+RETURNS BOOLEAN AS $$
+DECLARE
+    g games%ROWTYPE;
+    v_attendees BIGINT[];
+BEGIN
+    SELECT * INTO g FROM games WHERE id = p_game_id FOR UPDATE;
+    IF NOT FOUND OR g.active OR g.stats_applied OR g.start_time > now() THEN
+        RETURN FALSE;
+    END IF;
+
+    v_attendees := ARRAY(
+        SELECT DISTINCT player_id
+        FROM (
+            SELECT player_id, ROW_NUMBER() OVER (ORDER BY timestamp, id) AS position
+            FROM signups
+            WHERE game_id = p_game_id
+        ) ranked
+        WHERE position <= COALESCE(g.max_players, p_default_capacity, position)
+    );
+
+    -- A game nobody signed up for (cancelled) does not break streaks
+    IF cardinality(v_attendees) > 0 THEN
+        UPDATE player_stats
+        SET current_streak = 0, updated_at = now()
+        WHERE current_streak > 0
+          AND NOT player_id = ANY (v_attendees);
+
+        INSERT INTO player_stats AS s (player_id, games_played, current_streak, longest_streak,
+                                       first_played_at, last_played_at)
+        SELECT player_id, 1, 1, 1, g.start_time, g.start_time
+        FROM unnest(v_attendees) AS player_id
+        ON CONFLICT (player_id) DO UPDATE
+        SET games_played = s.games_played + 1,
+            current_streak = s.current_streak + 1,
+            longest_streak = GREATEST(s.longest_streak, s.current_streak + 1),
+            first_played_at = LEAST(s.first_played_at, EXCLUDED.first_played_at),
+            last_played_at = GREATEST(s.last_played_at, EXCLUDED.last_played_at),
+            updated_at = now();
+    END IF;
+
+    -- Every ordered pair of players drawn into the same team
+    INSERT INTO player_teammates AS t (player_id, teammate_id, games_together)
+    SELECT a.player_id, b.player_id, 1
+    FROM (
+        SELECT tm.team_color, p.id AS player_id
+        FROM teams tm
+        CROSS JOIN LATERAL jsonb_array_elements_text(tm.players) AS name
+        JOIN players p ON normalize_nickname(p.nickname) = normalize_nickname(name)
+        WHERE tm.game_id = p_game_id
+    ) a
+    JOIN (
+        SELECT tm.team_color, p.id AS player_id
+        FROM teams tm
+        CROSS JOIN LATERAL jsonb_array_elements_text(tm.players) AS name
+        JOIN players p ON normalize_nickname(p.nickname) = normalize_nickname(name)
+        WHERE tm.game_id = p_game_id
+    ) b ON a.team_color = b.team_color AND a.player_id <> b.player_id
+    ON CONFLICT (player_id, teammate_id) DO UPDATE
+    SET games_together = t.games_together + 1;
+
+    UPDATE games SET stats_applied = TRUE WHERE id = p_game_id;
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rebuild_player_stats(p_default_capacity INTEGER DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    v_game_id UUID;
+    v_count INTEGER := 0;
+BEGIN
+    DELETE FROM player_teammates;
+    DELETE FROM player_stats;
+    UPDATE games SET stats_applied = FALSE WHERE stats_applied;
+
+    FOR v_game_id IN
+        SELECT id FROM games WHERE NOT active AND start_time <= now() ORDER BY start_time
+    LOOP
+        IF apply_game_stats(v_game_id, p_default_capacity) THEN
+            v_count := v_count + 1;
+        END IF;
+    END LOOP;
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill (games before capacity limits existed: every signup counts)
+SELECT rebuild_player_stats();
@@ -0,0 +1,273 @@
+-- Retention: signups and teams of old closed games move to archive tables
+-- partitioned by season (calendar year of the game), keeping the hot tables
+-- small. signups_all / teams_all show hot and archived rows together and are
+-- what history, payments and statistics read; payment updates through
+-- signups_all reach either table.
+--
+-- archive_games(before) moves every closed game that started before the
+-- given time and is already counted in the statistics. The scheduler calls
+-- it with retention.archive_after_days from game_consts.yaml.
+
+ALTER TABLE games ADD COLUMN IF NOT EXISTS archived BOOLEAN NOT NULL DEFAULT FALSE;
+
+CREATE TABLE IF NOT EXISTS signups_archive (
+    id UUID NOT NULL,
+    game_id UUID NOT NULL REFERENCES games (id) ON DELETE CASCADE,
+    nickname TEXT NOT NULL,
+    password_hash TEXT,  -- not kept: archived games are closed
+    timestamp TIMESTAMPTZ NOT NULL,
+    paid BOOLEAN DEFAULT FALSE,
+    player_id BIGINT NOT NULL REFERENCES players (id),
+    game_start TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (id, game_start)
+) PARTITION BY RANGE (game_start);
+
+CREATE INDEX IF NOT EXISTS signups_archive_game_id_idx ON signups_archive (game_id, timestamp);
+CREATE INDEX IF NOT EXISTS signups_archive_player_id_idx ON signups_archive (player_id);
+
+CREATE TABLE IF NOT EXISTS teams_archive (
+    id UUID NOT NULL,
+    game_id UUID NOT NULL REFERENCES games (id) ON DELETE CASCADE,
+    team_color TEXT NOT NULL,
+    players JSONB NOT NULL,
+    draw_id UUID,
+    drawn_at TIMESTAMPTZ NOT NULL,
+    game_start TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (id, game_start)
+) PARTITION BY RANGE (game_start);
+
+CREATE INDEX IF NOT EXISTS teams_archive_game_id_idx ON teams_archive (game_id);
+
+-- Partitions of one season for both archive tables
+CREATE OR REPLACE FUNCTION ensure_archive_partitions(p_year INTEGER)
+RETURNS VOID AS $$
+DECLARE
+    v_table TEXT;
+BEGIN
+    FOREACH v_table IN ARRAY ARRAY['signups_archive', 'teams_archive'] LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+            v_table || '_' || p_year, v_table,
+            make_timestamptz(p_year, 1, 1, 0, 0, 0, 'Europe/Warsaw'),
+            make_timestamptz(p_year + 1, 1, 1, 0, 0, 0, 'Europe/Warsaw')
+        );
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE VIEW signups_all AS
+SELECT id, game_id, nickname, password_hash, timestamp, paid, player_id FROM signups
+UNION ALL
+SELECT id, game_id, nickname, password_hash, timestamp, paid, player_id FROM signups_archive;
+
+CREATE OR REPLACE VIEW teams_all AS
+SELECT id, game_id, team_color, players, draw_id, drawn_at FROM teams
+UNION ALL
+SELECT id, game_id, team_color, players, draw_id, drawn_at FROM teams_archive;
+
+-- Payment flag changes through the view go to whichever table holds the row
+CREATE OR REPLACE FUNCTION signups_all_update_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE signups SET paid = NEW.paid WHERE id = OLD.id;
+    IF NOT FOUND THEN
+        UPDATE signups_archive SET paid = NEW.paid WHERE id = OLD.id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS signups_all_update ON signups_all;
+CREATE TRIGGER signups_all_update
+    INSTEAD OF UPDATE ON signups_all
+    FOR EACH ROW EXECUTE FUNCTION signups_all_update_trigger();
+
+-- ===== BALANCES AND STATISTICS OVER HOT + ARCHIVED ROWS =====
+
+-- Moving rows to the archive is not a balance change
+CREATE OR REPLACE FUNCTION signups_balance_trigger()
+RETURNS TRIGGER AS $$
+DECLARE
+    g games%ROWTYPE;
+BEGIN
+    IF current_setting('parkowa.archiving', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.paid IS FALSE THEN
+        SELECT * INTO g FROM games WHERE id = OLD.game_id;
+        IF FOUND AND NOT g.active AND g.start_time <= now() THEN
+            PERFORM apply_player_balance(OLD.player_id, -1, -g.cost_per_player);
+        END IF;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.paid IS FALSE THEN
+        SELECT * INTO g FROM games WHERE id = NEW.game_id;
+        IF FOUND AND NOT g.active AND g.start_time <= now() THEN
+            PERFORM apply_player_balance(NEW.player_id, 1, g.cost_per_player);
+        END IF;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS signups_archive_balance ON signups_archive;
+CREATE TRIGGER signups_archive_balance
+    AFTER UPDATE OF paid ON signups_archive
+    FOR EACH ROW EXECUTE FUNCTION signups_balance_trigger();
+
+CREATE OR REPLACE FUNCTION games_balance_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NOT OLD.active AND OLD.start_time <= now() THEN
+        PERFORM apply_player_balance(s.player_id, -COUNT(*)::INTEGER, -COUNT(*) * OLD.cost_per_player)
+        FROM signups_all s
+        WHERE s.game_id = OLD.id AND s.paid IS FALSE
+        GROUP BY s.player_id;
+    END IF;
+
+    IF TG_OP = 'UPDATE' THEN
+        IF NOT NEW.active AND NEW.start_time <= now() THEN
+            PERFORM apply_player_balance(s.player_id, COUNT(*)::INTEGER, COUNT(*) * NEW.cost_per_player)
+            FROM signups_all s
+            WHERE s.game_id = NEW.id AND s.paid IS FALSE
+            GROUP BY s.player_id;
+        END IF;
+        RETURN NEW;
+    END IF;
+
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rebuild_player_balances()
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM player_balances;
+    INSERT INTO player_balances (player_id, unpaid_games, amount_due)
+    SELECT s.player_id, COUNT(*), COALESCE(SUM(g.cost_per_player), 0)
+    FROM signups_all s
+    JOIN games g ON s.game_id = g.id
+    WHERE s.paid IS FALSE
+      AND NOT g.active
+      AND g.start_time <= now()
+    GROUP BY s.player_id;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION apply_game_stats(p_game_id UUID, p_default_capacity INTEGER DEFAULT NULL)
+RETURNS BOOLEAN AS $$
+DECLARE
+    g games%ROWTYPE;
+    v_attendees BIGINT[];
+BEGIN
+    SELECT * INTO g FROM games WHERE id = p_game_id FOR UPDATE;
+    IF NOT FOUND OR g.active OR g.stats_applied OR g.start_time > now() THEN
+        RETURN FALSE;
+    END IF;
+
+    v_attendees := ARRAY(
+        SELECT DISTINCT player_id
+        FROM (
+            SELECT player_id, ROW_NUMBER() OVER (ORDER BY timestamp, id) AS position
+            FROM signups_all
+            WHERE game_id = p_game_id
+        ) ranked
+        WHERE position <= COALESCE(g.max_players, p_default_capacity, position)
+    );
+
+    -- A game nobody signed up for (cancelled) does not break streaks
+    IF cardinality(v_attendees) > 0 THEN
+        UPDATE player_stats
+        SET current_streak = 0, updated_at = now()
+        WHERE current_streak > 0
+          AND NOT player_id = ANY (v_attendees);
+
+        INSERT INTO player_stats AS s (player_id, games_played, current_streak, longest_streak,
+                                       first_played_at, last_played_at)
+        SELECT player_id, 1, 1, 1, g.start_time, g.start_time
+        FROM unnest(v_attendees) AS player_id
+        ON CONFLICT (player_id) DO UPDATE
+        SET games_played = s.games_played + 1,
+            current_streak = s.current_streak + 1,
+            longest_streak = GREATEST(s.longest_streak, s.current_streak + 1),
+            first_played_at = LEAST(s.first_played_at, EXCLUDED.first_played_at),
+            last_played_at = GREATEST(s.last_played_at, EXCLUDED.last_played_at),
+            updated_at = now();
+    END IF;
+
+    -- Every ordered pair of players drawn into the same team
+    INSERT INTO player_teammates AS t (player_id, teammate_id, games_together)
+    SELECT a.player_id, b.player_id, 1
+    FROM (
+        SELECT tm.team_color, p.id AS player_id
+        FROM teams_all tm
+        CROSS JOIN LATERAL jsonb_array_elements_text(tm.players) AS name
+        JOIN players p ON normalize_nickname(p.nickname) = normalize_nickname(name)
+        WHERE tm.game_id = p_game_id
+    ) a
+    JOIN (
+        SELECT tm.team_color, p.id AS player_id
+        FROM teams_all tm
+        CROSS JOIN LATERAL jsonb_array_elements_text(tm.players) AS name
+        JOIN players p ON normalize_nickname(p.nickname) = normalize_nickname(name)
+        WHERE tm.game_id = p_game_id
+    ) b ON a.team_color = b.team_color AND a.player_id <> b.player_id
+    ON CONFLICT (player_id, teammate_id) DO UPDATE
+    SET games_together = t.games_together + 1;
+
+    UPDATE games SET stats_applied = TRUE WHERE id = p_game_id;
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ===== ARCHIVING =====
+
+CREATE OR REPLACE FUNCTION archive_games(p_before TIMESTAMPTZ)
+RETURNS INTEGER AS $$
+DECLARE
+    v_year INTEGER;
+    v_game_ids UUID[];
+BEGIN
+    v_game_ids := ARRAY(
+        SELECT id FROM games
+        WHERE NOT active
+          AND NOT archived
+          AND stats_applied
+          AND start_time < p_before
+        FOR UPDATE
+    );
+    IF cardinality(v_game_ids) = 0 THEN
+        RETURN 0;
+    END IF;
+
+    FOR v_year IN
+        SELECT DISTINCT extract(year FROM start_time AT TIME ZONE 'Europe/Warsaw')::INTEGER
+        FROM games WHERE id = ANY (v_game_ids)
+    LOOP
+        PERFORM ensure_archive_partitions(v_year);
+    END LOOP;
+
+    PERFORM set_config('parkowa.archiving', 'on', true);
+
+    INSERT INTO signups_archive (id, game_id, nickname, timestamp, paid, player_id, game_start)
+    SELECT s.id, s.game_id, s.nickname, s.timestamp, s.paid, s.player_id, g.start_time
+    FROM signups s
+    JOIN games g ON g.id = s.game_id
+    WHERE s.game_id = ANY (v_game_ids);
+
+    INSERT INTO teams_archive (id, game_id, team_color, players, draw_id, drawn_at, game_start)
+    SELECT t.id, t.game_id, t.team_color, t.players, t.draw_id, t.drawn_at, g.start_time
+    FROM teams t
+    JOIN games g ON g.id = t.game_id
+    WHERE t.game_id = ANY (v_game_ids);
+
+    DELETE FROM signups WHERE game_id = ANY (v_game_ids);
+    DELETE FROM teams WHERE game_id = ANY (v_game_ids);
+    UPDATE games SET archived = TRUE WHERE id = ANY (v_game_ids);
+
+    PERFORM set_config('parkowa.archiving', 'off', true);
+    RETURN cardinality(v_game_ids);
+END;
+$$ LANGUAGE plpgsql;
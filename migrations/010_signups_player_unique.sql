@@ -0,0 +1,16 @@
+-- One signup per player and game, enforced by the database
+--
+-- add_signup checks for an existing signup before inserting, but two
+-- concurrent requests can both pass that check. The unique index makes the
+-- second INSERT a no-op (ON CONFLICT DO NOTHING in add_signup).
+-- Duplicates that slipped in before are removed first, keeping each
+-- player's earliest signup (its place on the list); the balance and
+-- version triggers account for the deleted rows.
+
+DELETE FROM signups s
+USING signups earlier
+WHERE earlier.game_id = s.game_id
+  AND earlier.player_id = s.player_id
+  AND (earlier.timestamp, earlier.id) < (s.timestamp, s.id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS signups_game_player_key ON signups (game_id, player_id);
@@ -0,0 +1,95 @@
+-- Debtor ledger keyed on an explicit games.charged state
+--
+-- Until now a signup counted when its game was inactive and start_time had
+-- passed *at the moment a row changed*. A game deactivated before its start
+-- time (e.g. cancelled early) was never charged, since nothing fires when
+-- start_time passes. The scheduler now sets games.charged once an inactive
+-- game's start time has passed, and the triggers only look at
+-- (NOT active AND charged) - a state, not the clock.
+
+ALTER TABLE games ADD COLUMN IF NOT EXISTS charged BOOLEAN NOT NULL DEFAULT FALSE;
+
+CREATE INDEX IF NOT EXISTS games_charge_pending_idx
+    ON games (start_time)
+    WHERE NOT active AND NOT charged;
+
+-- Does not fire games_balance_update yet (charged is not among its columns);
+-- the ledger is rebuilt at the end
+UPDATE games SET charged = TRUE WHERE NOT active AND start_time <= now();
+
+CREATE OR REPLACE FUNCTION signups_balance_trigger()
+RETURNS TRIGGER AS $$
+DECLARE
+    g games%ROWTYPE;
+BEGIN
+    IF current_setting('parkowa.archiving', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.paid IS FALSE THEN
+        SELECT * INTO g FROM games WHERE id = OLD.game_id;
+        IF FOUND AND NOT g.active AND g.charged THEN
+            PERFORM apply_player_balance(OLD.player_id, -1, -g.cost_per_player);
+        END IF;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.paid IS FALSE THEN
+        SELECT * INTO g FROM games WHERE id = NEW.game_id;
+        IF FOUND AND NOT g.active AND g.charged THEN
+            PERFORM apply_player_balance(NEW.player_id, 1, g.cost_per_player);
+        END IF;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION games_balance_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NOT OLD.active AND OLD.charged THEN
+        PERFORM apply_player_balance(s.player_id, -COUNT(*)::INTEGER, -COUNT(*) * OLD.cost_per_player)
+        FROM signups_all s
+        WHERE s.game_id = OLD.id AND s.paid IS FALSE
+        GROUP BY s.player_id;
+    END IF;
+
+    IF TG_OP = 'UPDATE' THEN
+        IF NOT NEW.active AND NEW.charged THEN
+            PERFORM apply_player_balance(s.player_id, COUNT(*)::INTEGER, COUNT(*) * NEW.cost_per_player)
+            FROM signups_all s
+            WHERE s.game_id = NEW.id AND s.paid IS FALSE
+            GROUP BY s.player_id;
+        END IF;
+        RETURN NEW;
+    END IF;
+
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS games_balance_update ON games;
+CREATE TRIGGER games_balance_update
+    AFTER UPDATE OF active, charged, cost_per_player ON games
+    FOR EACH ROW
+    WHEN (OLD.active IS DISTINCT FROM NEW.active
+          OR OLD.charged IS DISTINCT FROM NEW.charged
+          OR OLD.cost_per_player IS DISTINCT FROM NEW.cost_per_player)
+    EXECUTE FUNCTION games_balance_trigger();
+
+CREATE OR REPLACE FUNCTION rebuild_player_balances()
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM player_balances;
+    INSERT INTO player_balances (player_id, unpaid_games, amount_due)
+    SELECT s.player_id, COUNT(*), COALESCE(SUM(g.cost_per_player), 0)
+    FROM signups_all s
+    JOIN games g ON s.game_id = g.id
+    WHERE s.paid IS FALSE
+      AND NOT g.active
+      AND g.charged
+    GROUP BY s.player_id;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT rebuild_player_balances();
@@ -0,0 +1,18 @@
+-- A change of games.max_players moves signups to/from the reserve list, so it
+-- bumps signups_version like a signup does - clients that revalidate on the
+-- version (API ETag, live list, snapshots) then refetch the list.
+
+CREATE OR REPLACE FUNCTION bump_signups_version_on_capacity()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.signups_version := OLD.signups_version + 1;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS games_capacity_version ON games;
+CREATE TRIGGER games_capacity_version
+    BEFORE UPDATE OF max_players ON games
+    FOR EACH ROW
+    WHEN (OLD.max_players IS DISTINCT FROM NEW.max_players)
+    EXECUTE FUNCTION bump_signups_version_on_capacity();
@@ -3,15 +3,113 @@ Supabase PostgreSQL database configuration and connection management
 """
 
 import os
+import time
+import uuid
+import contextvars
 import streamlit as st
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
+from contextlib import contextmanager
 from dotenv import load_dotenv
 from typing import Optional, List, Dict, Any
+from src.query_metrics import METRICS, fingerprint, start_metrics_exporter, track_statement
 
 # Load environment variables
 load_dotenv()
 
+# Rows per round trip of server-side cursors (stream_query / stream_chunks)
+STREAM_ITERSIZE = int(os.getenv("DB_STREAM_ITERSIZE", "2000"))
+
+# Per-rerun memo of SELECT results, active inside rerun_read_cache()
+_read_cache = contextvars.ContextVar("rerun_read_cache", default=None)
+
+
+@contextmanager
+def rerun_read_cache():
+    """Memoize SELECTs issued inside the block (one script rerun); any write clears it"""
+    token = _read_cache.set({})
+    try:
+        yield
+    finally:
+        _read_cache.reset(token)
+
+
+def _cache_key(query: str, params):
+    """Key for the read cache, or None if params are not hashable"""
+    key = (query, params)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def invalidate_read_cache():
+    """Forget cached reads after a write (triggers may touch other tables too)"""
+    cache = _read_cache.get()
+    if cache:
+        cache.clear()
+
+class InstrumentedCursor(RealDictCursor):
+    """RealDictCursor recording execute/fetch timings and row counts in query_metrics"""
+    
+    def _start_statement(self, query):
+        if isinstance(query, bytes):
+            query = query.decode('utf-8', errors='replace')
+        elif not isinstance(query, str):
+            query = query.as_string(self)
+        self._query_id, statement = fingerprint(query)
+        self._exec_seconds = 0.0
+        return statement
+    
+    def _finish_statement(self, statement, start):
+        self._exec_seconds = time.perf_counter() - start
+        METRICS.observe('execute', self._exec_seconds, self._query_id, statement)
+        track_statement(self._query_id, statement)
+        if self.description is None:
+            # No result set, so the statement is complete
+            METRICS.check_slow(self._exec_seconds, self._query_id)
+    
+    def _finish_fetch(self, start, rows):
+        seconds = time.perf_counter() - start
+        METRICS.observe('fetch', seconds, self._query_id, rows=rows)
+        METRICS.check_slow(self._exec_seconds + seconds, self._query_id, rows)
+    
+    def execute(self, query, vars=None):
+        statement = self._start_statement(query)
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            self._finish_statement(statement, start)
+    
+    def executemany(self, query, vars_list):
+        statement = self._start_statement(query)
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            self._finish_statement(statement, start)
+    
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._finish_fetch(start, len(rows))
+        return rows
+    
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(size) if size is not None else super().fetchmany()
+        self._finish_fetch(start, len(rows))
+        return rows
+    
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._finish_fetch(start, 1 if row is not None else 0)
+        return row
+
+
 class SupabaseDB:
     def __init__(self):
         self.connection_string = self._get_connection_string()
@@ -35,17 +133,29 @@ class SupabaseDB:
     def get_connection(self):
         """Get simple, fast database connection"""
         try:
-            return psycopg2.connect(
+            start = time.perf_counter()
+            connection = psycopg2.connect(
                 self.connection_string,
-                cursor_factory=RealDictCursor,
-                sslmode='require'
+                cursor_factory=InstrumentedCursor,
+                sslmode=os.getenv("DATABASE_SSLMODE", "require")  # "disable" for a local Postgres
             )
+            METRICS.observe('connect', time.perf_counter() - start)
+            return connection
         except Exception as e:
             st.error(f"Błąd połączenia z bazą danych: {e}")
             raise e
     
     def execute_query(self, query: str, params: Optional[tuple] = None) -> Optional[List[Dict[str, Any]]]:
         """Execute query and return results with explicit connection management"""
+        is_select = query.strip().lower().startswith('select')
+        cache = _read_cache.get()
+        key = _cache_key(query, params) if cache is not None and is_select else None
+        if key is not None and key in cache:
+            # Copies, so callers may modify rows freely
+            return [dict(row) for row in cache[key]]
+        if not is_select:
+            invalidate_read_cache()
+        
         connection = None
         try:
             connection = self.get_connection()
@@ -54,8 +164,10 @@ class SupabaseDB:
                 cur.execute(query, params)
                 
                 # For SELECT queries, return results
-                if query.strip().lower().startswith('select'):
+                if is_select:
                     results = [dict(row) for row in cur.fetchall()]
+                    if key is not None:
+                        cache[key] = [dict(row) for row in results]
                     return results
                 
                 # For other queries, commit and return affected rows
@@ -72,6 +184,7 @@ class SupabaseDB:
     
     def execute_many(self, query: str, params_list: List[tuple]) -> int:
         """Execute query with multiple parameter sets with explicit connection management"""
+        invalidate_read_cache()
         connection = None
         try:
             connection = self.get_connection()
@@ -88,8 +201,111 @@ class SupabaseDB:
             if connection and not connection.closed:
                 connection.close()
 
+    def execute_values(self, query: str, params_list: List[tuple], template: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Execute a batched write as one statement with a multi-row VALUES list
+        
+        The query must contain a single %s where the VALUES rows go, e.g.
+        UPDATE t SET x = v.x FROM (VALUES %s) AS v(id, x) WHERE t.id = v.id RETURNING t.id.
+        The query may also be a psycopg2.sql.Composable for fixed parameters.
+        Returns the RETURNING rows (one dict per affected row).
+        """
+        if not params_list:
+            return []
+        
+        invalidate_read_cache()
+        connection = None
+        try:
+            connection = self.get_connection()
+            
+            with connection.cursor() as cur:
+                # page_size covers the whole list so it is a single round trip
+                results = execute_values(
+                    cur, query, params_list,
+                    template=template, page_size=len(params_list), fetch=True
+                )
+                connection.commit()
+                return [dict(row) for row in results]
+        except Exception as e:
+            st.error(f"Błąd wykonywania zapytań wsadowych: {e}")
+            raise e
+        finally:
+            # ALWAYS close connection explicitly
+            if connection and not connection.closed:
+                connection.close()
+    
+    @contextmanager
+    def transaction(self):
+        """Yield a cursor on one connection; commit on success, roll back on error"""
+        invalidate_read_cache()
+        connection = None
+        try:
+            connection = self.get_connection()
+            
+            with connection.cursor() as cur:
+                yield cur
+            connection.commit()
+        except Exception as e:
+            if connection and not connection.closed:
+                connection.rollback()
+            st.error(f"Błąd wykonywania transakcji: {e}")
+            raise e
+        finally:
+            # ALWAYS close connection explicitly
+            if connection and not connection.closed:
+                connection.close()
+    
+    @contextmanager
+    def read_snapshot(self):
+        """Yield one read-only REPEATABLE READ connection, so several streamed reads see the same data"""
+        connection = None
+        try:
+            connection = self.get_connection()
+            connection.set_session(isolation_level='REPEATABLE READ', readonly=True)
+            yield connection
+        finally:
+            if connection and not connection.closed:
+                connection.close()
+    
+    def stream_chunks(self, query: str, params: Optional[tuple] = None,
+                      itersize: Optional[int] = None, connection=None):
+        """Yield lists of up to `itersize` row dicts from a named server-side cursor
+        
+        Only one chunk is held in memory and the first rows arrive before the
+        query has been fully read. Results bypass the per-rerun read cache.
+        Uses `connection` (e.g. from read_snapshot()) if given, otherwise opens
+        one that is closed when the generator finishes or is closed early.
+        """
+        itersize = itersize or STREAM_ITERSIZE
+        own_connection = connection is None
+        try:
+            if own_connection:
+                connection = self.get_connection()
+                connection.set_session(readonly=True)
+            
+            with connection.cursor(name=f"stream_{uuid.uuid4().hex[:12]}") as cur:
+                cur.itersize = itersize
+                cur.execute(query, params)
+                while True:
+                    rows = cur.fetchmany(itersize)
+                    if not rows:
+                        break
+                    yield [dict(row) for row in rows]
+        except Exception as e:
+            st.error(f"Błąd strumieniowego odczytu: {e}")
+            raise e
+        finally:
+            if own_connection and connection and not connection.closed:
+                connection.close()
+    
+    def stream_query(self, query: str, params: Optional[tuple] = None,
+                     itersize: Optional[int] = None, connection=None):
+        """Yield row dicts one at a time (see stream_chunks)"""
+        for rows in self.stream_chunks(query, params, itersize, connection):
+            yield from rows
+
 # Global database instance
 @st.cache_resource
 def get_db() -> SupabaseDB:
     """Get cached database instance"""
+    start_metrics_exporter()
     return SupabaseDB()
@@ -1,80 +1,317 @@
 """
 Application time configuration - loaded from YAML file
+
+game_consts.yaml is compiled once into an immutable, validated GameConfig
+with all derived values (messages, allowed player counts, team partitions)
+precomputed. get_config() returns the current object and swaps in a new one
+when the file's mtime changes, so edits are picked up without a restart.
+A broken edit is logged and the previous configuration stays in use.
+
+Shared by the Streamlit app and github_scheduler.py - no Streamlit imports
+at module level.
 """
 
-import yaml
 import os
+import time
+import logging
+import threading
 from pathlib import Path
+from types import MappingProxyType
+from dataclasses import dataclass
+import yaml
+
+logger = logging.getLogger(__name__)
 
 # Path to configuration file
 CONFIG_FILE = Path(__file__).parent.parent / "game_consts.yaml"
 
-def load_config():
-    """Loads configuration from YAML file"""
+# How often (seconds) get_config() looks at the file's mtime
+RELOAD_CHECK_SECONDS = float(os.getenv("CONFIG_RELOAD_SECONDS", "2"))
+
+
+class ConfigError(ValueError):
+    """Invalid game_consts.yaml"""
+
+
+@dataclass(frozen=True)
+class WeeklyTime:
+    """Day of the week (0=monday) and time"""
+    day: int
+    hour: int
+    minute: int
+
+    def label(self, day_names: tuple) -> str:
+        return f"{day_names[self.day]} {self.hour:02d}:{self.minute:02d}"
+
+
+@dataclass(frozen=True)
+class TeamConfig:
+    """Team split for one player count"""
+    teams: int
+    colors: tuple
+    players_per_team: tuple
+    partition: tuple  # ((color, start, end), ...) - slices of the shuffled player list
+
+    def __getitem__(self, key):
+        # Backward compatibility with the old dict form
+        if key not in ("teams", "colors", "players_per_team"):
+            raise KeyError(key)
+        return getattr(self, key)
+
+
+@dataclass(frozen=True)
+class LiveListConfig:
+    poll_seconds: float = 5
+    max_poll_seconds: float = 60
+    backoff_factor: float = 2
+    idle_stop_minutes: float = 15
+
+
+@dataclass(frozen=True)
+class GameConfig:
+    game: WeeklyTime
+    signup: WeeklyTime
+    draw: WeeklyTime
+    teams: MappingProxyType  # player count -> TeamConfig
+    allowed_player_counts: tuple
+    default_max_players: int  # None = no limit
+    archive_after_days: int  # None = no archiving
+    day_names: tuple
+    manual_draw_message: str
+    draw_not_available_message: str
+    signup_opening_message: str
+    live_list: LiveListConfig
+    query_budgets: MappingProxyType  # page name -> max statements per rerun
+    n_plus_one_threshold: int
+    blik_number: str  # YAML fallback, the real value lives in Streamlit secrets
+    mtime_ns: int = 0
+
+
+def _section(raw: dict, name: str) -> dict:
+    value = raw.get(name)
+    if not isinstance(value, dict):
+        raise ConfigError(f"Brak sekcji '{name}'")
+    return value
+
+
+def _int(section: dict, key: str, name: str, low: int, high: int) -> int:
+    value = section.get(key)
+    if isinstance(value, bool) or not isinstance(value, int) or not low <= value <= high:
+        raise ConfigError(f"{name}.{key} musi być liczbą całkowitą z zakresu {low}-{high} (jest: {value!r})")
+    return value
+
+
+def _weekly_time(raw: dict, name: str) -> WeeklyTime:
+    section = _section(raw, name)
+    return WeeklyTime(
+        day=_int(section, 'day', name, 0, 6),
+        hour=_int(section, 'hour', name, 0, 23),
+        minute=_int(section, 'minute', name, 0, 59),
+    )
+
+
+def _team_config(players_count: int, section: dict) -> TeamConfig:
+    name = f"teams.{players_count}"
+    if not isinstance(section, dict):
+        raise ConfigError(f"Niepoprawna sekcja {name}")
+    count = _int(section, 'count', name, 1, players_count)
+    colors = tuple(section.get('colors') or ())
+    sizes = tuple(section.get('players_per_team') or ())
+    if len(colors) != count or len(sizes) != count:
+        raise ConfigError(f"{name}: liczba kolorów i składów musi być równa count ({count})")
+    if len(set(colors)) != count:
+        raise ConfigError(f"{name}: kolory drużyn muszą być różne")
+    if sum(sizes) != players_count:
+        raise ConfigError(f"{name}: suma players_per_team ({sum(sizes)}) różna od {players_count}")
+
+    partition = []
+    start = 0
+    for color, size in zip(colors, sizes):
+        partition.append((color, start, start + size))
+        start += size
+    return TeamConfig(teams=count, colors=colors, players_per_team=sizes, partition=tuple(partition))
+
+
+def compile_config(raw: dict, mtime_ns: int = 0) -> GameConfig:
+    """Validates parsed YAML and builds the immutable GameConfig"""
+    if not isinstance(raw, dict):
+        raise ConfigError("Plik konfiguracji jest pusty lub niepoprawny")
+
+    game = _weekly_time(raw, 'game')
+    signup = _weekly_time(raw, 'signup')
+    draw = _weekly_time(raw, 'draw')
+
+    day_names = tuple(raw.get('day_names') or ())
+    if len(day_names) != 7:
+        raise ConfigError("day_names musi zawierać 7 nazw dni")
+
+    teams = {}
+    for players_count, section in _section(raw, 'teams').items():
+        try:
+            players_count = int(players_count)
+        except (TypeError, ValueError):
+            raise ConfigError(f"Niepoprawna liczba graczy w teams: {players_count!r}")
+        teams[players_count] = _team_config(players_count, section)
+
+    manual_draw_message = _section(raw, 'messages').get('manual_draw')
+    if not manual_draw_message:
+        raise ConfigError("Brak messages.manual_draw")
+
+    live_list_raw = raw.get('live_list') or {}
+    live_list = LiveListConfig(**{
+        key: live_list_raw[key] for key in LiveListConfig.__dataclass_fields__ if key in live_list_raw
+    })
+    if live_list.poll_seconds <= 0 or live_list.max_poll_seconds < live_list.poll_seconds:
+        raise ConfigError("live_list: poll_seconds > 0 i max_poll_seconds >= poll_seconds")
+
+    default_max_players = (raw.get('capacity') or {}).get('default_max_players')
+    if default_max_players is not None and (isinstance(default_max_players, bool)
+                                            or not isinstance(default_max_players, int)
+                                            or default_max_players <= 0):
+        raise ConfigError(f"capacity.default_max_players musi być dodatnią liczbą całkowitą (jest: {default_max_players!r})")
+
+    archive_after_days = (raw.get('retention') or {}).get('archive_after_days')
+    if archive_after_days is not None and (isinstance(archive_after_days, bool)
+                                           or not isinstance(archive_after_days, int)
+                                           or archive_after_days <= 0):
+        raise ConfigError(f"retention.archive_after_days musi być dodatnią liczbą całkowitą (jest: {archive_after_days!r})")
+
+    budgets = dict(raw.get('query_budgets') or {})
+    n_plus_one_threshold = budgets.pop('n_plus_one_threshold', 3)
+
+    return GameConfig(
+        game=game,
+        signup=signup,
+        draw=draw,
+        teams=MappingProxyType(dict(sorted(teams.items()))),
+        allowed_player_counts=tuple(sorted(teams)),
+        default_max_players=default_max_players,
+        archive_after_days=archive_after_days,
+        day_names=day_names,
+        manual_draw_message=manual_draw_message,
+        draw_not_available_message=(
+            f"Losowanie składów jest dostępne tylko w {day_names[draw.day]} "
+            f"od {draw.hour:02d}:{draw.minute:02d}!"
+        ),
+        signup_opening_message=(
+            f"Nowa gierka otworzy się w {day_names[signup.day]} "
+            f"o {signup.hour:02d}:{signup.minute:02d}."
+        ),
+        live_list=live_list,
+        query_budgets=MappingProxyType(budgets),
+        n_plus_one_threshold=n_plus_one_threshold,
+        blik_number=(raw.get('payments') or {}).get('blik_number'),
+        mtime_ns=mtime_ns,
+    )
+
+
+def load_config(path: Path = None) -> GameConfig:
+    """Reads and compiles the configuration file"""
+    path = path or CONFIG_FILE
     try:
-        with open(CONFIG_FILE, 'r', encoding='utf-8') as file:
-            return yaml.safe_load(file)
+        mtime_ns = os.stat(path).st_mtime_ns
+        with open(path, 'r', encoding='utf-8') as file:
+            return compile_config(yaml.safe_load(file), mtime_ns)
+    except ConfigError:
+        raise
     except Exception as e:
-        raise Exception(f"Błąd wczytywania konfiguracji z {CONFIG_FILE}: {e}")
+        raise ConfigError(f"Błąd wczytywania konfiguracji z {path}: {e}")
 
-# Load configuration
-_config = load_config()
 
-# ===== GAME SCHEDULE =====
-GAME_DAY = _config['game']['day']
-GAME_START_HOUR = _config['game']['hour']
-GAME_START_MINUTE = _config['game']['minute']
+_config = None
+_checked_at = 0.0
+_reload_lock = threading.Lock()
 
-# ===== SIGNUP OPENING =====
-SIGNUP_OPEN_DAY = _config['signup']['day']
-SIGNUP_OPEN_HOUR = _config['signup']['hour']
-SIGNUP_OPEN_MINUTE = _config['signup']['minute']
 
-# ===== LINEUP DRAWING =====
-DRAW_ALLOWED_DAY = _config['draw']['day']
-DRAW_ALLOWED_HOUR = _config['draw']['hour']
-DRAW_ALLOWED_MINUTE = _config['draw']['minute']
+def get_config() -> GameConfig:
+    """Current configuration, reloaded when game_consts.yaml changes"""
+    global _config, _checked_at
+    config = _config
+    if config is not None and time.monotonic() - _checked_at < RELOAD_CHECK_SECONDS:
+        return config
 
-# ===== TEAM LINEUPS =====
-TEAM_CONFIGS = {}
-for players_count, config in _config['teams'].items():
-    TEAM_CONFIGS[int(players_count)] = {
-        "teams": config['count'],
-        "colors": config['colors'],
-        "players_per_team": config['players_per_team']
-    }
+    with _reload_lock:
+        if _config is not None and time.monotonic() - _checked_at < RELOAD_CHECK_SECONDS:
+            return _config
+        _checked_at = time.monotonic()
+        try:
+            changed = _config is None or os.stat(CONFIG_FILE).st_mtime_ns != _config.mtime_ns
+        except OSError as e:
+            if _config is None:
+                raise ConfigError(f"Błąd wczytywania konfiguracji z {CONFIG_FILE}: {e}")
+            logger.error(f"Nie można odczytać {CONFIG_FILE}, zostaje poprzednia konfiguracja: {e}")
+            return _config
 
-ALLOWED_PLAYER_COUNTS = list(TEAM_CONFIGS.keys())
+        if changed:
+            try:
+                new_config = load_config()
+            except ConfigError as e:
+                if _config is None:
+                    raise
+                logger.error(f"{e} - zostaje poprzednia konfiguracja")
+                return _config
+            if _config is not None:
+                logger.info(f"Przeładowano konfigurację z {CONFIG_FILE}")
+            _config = new_config  # single reference swap - readers see old or new, never a mix
+        return _config
 
-# ===== MESSAGES =====
-MANUAL_DRAW_MESSAGE = _config['messages']['manual_draw']
 
 # ===== PAYMENTS =====
-# Payment configuration loaded from Streamlit secrets for security
-import streamlit as st
-try:
-    TREASURER_PASSWORD = st.secrets["treasurer_password"]
-except KeyError:
-    TREASURER_PASSWORD = "default_password"  # Fallback for development
-
-try:
-    BLIK_NUMBER = st.secrets["blik_number"]
-except KeyError:
-    # Fallback to YAML config for backward compatibility
+# Payment configuration loaded from Streamlit secrets for security.
+# Read on first access (module __getattr__), not at import time.
+def _load_treasurer_password():
+    import streamlit as st
+    try:
+        return st.secrets["treasurer_password"] or None
+    except (KeyError, FileNotFoundError):  # FileNotFoundError: no secrets.toml at all
+        return None  # Not configured - treasurer pages stay locked
+
+
+def _load_blik_number():
+    import streamlit as st
     try:
-        BLIK_NUMBER = _config['payments']['blik_number']
-    except KeyError:
-        BLIK_NUMBER = "Not configured - check Streamlit secrets"  # Clear fallback message
-
-# Generating messages based on configuration
-_day_names = _config['day_names']
-
-DRAW_NOT_AVAILABLE_MESSAGE = (
-    f"Losowanie składów jest dostępne tylko w {_day_names[DRAW_ALLOWED_DAY]} "
-    f"od {DRAW_ALLOWED_HOUR:02d}:{DRAW_ALLOWED_MINUTE:02d}!"
-)
-
-SIGNUP_OPENING_MESSAGE = (
-    f"Nowa gierka otworzy się w {_day_names[SIGNUP_OPEN_DAY]} "
-    f"o {SIGNUP_OPEN_HOUR:02d}:{SIGNUP_OPEN_MINUTE:02d}."
-)
+        return st.secrets["blik_number"]
+    except (KeyError, FileNotFoundError):
+        # Fallback to YAML config for backward compatibility
+        return get_config().blik_number or "Not configured - check Streamlit secrets"  # Clear fallback message
+
+
+_lazy_settings = {
+    'TREASURER_PASSWORD': _load_treasurer_password,
+    'BLIK_NUMBER': _load_blik_number,
+}
+
+# Old module-level constants, resolved from the current config on access.
+# New code should call get_config() so it sees reloads.
+_legacy_settings = {
+    'GAME_DAY': lambda c: c.game.day,
+    'GAME_START_HOUR': lambda c: c.game.hour,
+    'GAME_START_MINUTE': lambda c: c.game.minute,
+    'SIGNUP_OPEN_DAY': lambda c: c.signup.day,
+    'SIGNUP_OPEN_HOUR': lambda c: c.signup.hour,
+    'SIGNUP_OPEN_MINUTE': lambda c: c.signup.minute,
+    'DRAW_ALLOWED_DAY': lambda c: c.draw.day,
+    'DRAW_ALLOWED_HOUR': lambda c: c.draw.hour,
+    'DRAW_ALLOWED_MINUTE': lambda c: c.draw.minute,
+    'TEAM_CONFIGS': lambda c: c.teams,
+    'ALLOWED_PLAYER_COUNTS': lambda c: list(c.allowed_player_counts),
+    'MANUAL_DRAW_MESSAGE': lambda c: c.manual_draw_message,
+    'DRAW_NOT_AVAILABLE_MESSAGE': lambda c: c.draw_not_available_message,
+    'SIGNUP_OPENING_MESSAGE': lambda c: c.signup_opening_message,
+    'LIVE_LIST_POLL_SECONDS': lambda c: c.live_list.poll_seconds,
+    'LIVE_LIST_MAX_POLL_SECONDS': lambda c: c.live_list.max_poll_seconds,
+    'LIVE_LIST_BACKOFF_FACTOR': lambda c: c.live_list.backoff_factor,
+    'LIVE_LIST_IDLE_STOP_MINUTES': lambda c: c.live_list.idle_stop_minutes,
+    'QUERY_BUDGETS': lambda c: c.query_budgets,
+    'N_PLUS_ONE_THRESHOLD': lambda c: c.n_plus_one_threshold,
+}
+
+
+def __getattr__(name):
+    if name in _lazy_settings:
+        value = _lazy_settings[name]()
+        globals()[name] = value
+        return value
+    if name in _legacy_settings:
+        return _legacy_settings[name](get_config())
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,162 @@
+"""
+Per-page render timing and opt-in profiling
+
+profile_section() records wall time, DB time, CPU time and the number of
+top-level Streamlit elements for a page or a section of it. Aggregated
+percentiles are kept in memory (RENDER_STATS) for the admin view.
+
+Profiling (pyinstrument if installed, otherwise cProfile) is opt-in:
+  - PROFILE_PAGES=1 profiles every page rerun
+  - ?profile=<PROFILE_TOKEN> profiles a single rerun when PROFILE_TOKEN is set
+"""
+
+import io
+import os
+import math
+import time
+import pstats
+import cProfile
+import threading
+from collections import deque
+from contextlib import contextmanager
+import streamlit as st
+from src.query_metrics import db_time_counter, db_seconds
+
+SAMPLES_PER_KEY = 500
+
+
+def _percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+class RenderStats:
+    """Recent render samples per (page, section), thread-safe"""
+    
+    def __init__(self, maxlen: int = SAMPLES_PER_KEY):
+        self.maxlen = maxlen
+        self._samples = {}
+        self._lock = threading.Lock()
+    
+    def record(self, page: str, section: str, wall: float, db: float, cpu: float, elements: int):
+        with self._lock:
+            samples = self._samples.get((page, section))
+            if samples is None:
+                samples = self._samples[(page, section)] = deque(maxlen=self.maxlen)
+            samples.append((wall, db, cpu, elements))
+    
+    def summary(self) -> list:
+        """One row per (page, section) with p50/p95/p99 in milliseconds"""
+        with self._lock:
+            items = [(key, list(samples)) for key, samples in self._samples.items()]
+        
+        rows = []
+        for (page, section), samples in sorted(items):
+            walls, dbs, cpus, elements = zip(*samples)
+            rows.append({
+                "Strona": page,
+                "Sekcja": section,
+                "Liczba": len(samples),
+                "Czas p50 ms": round(_percentile(walls, 50) * 1000, 1),
+                "Czas p95 ms": round(_percentile(walls, 95) * 1000, 1),
+                "Czas p99 ms": round(_percentile(walls, 99) * 1000, 1),
+                "DB p50 ms": round(_percentile(dbs, 50) * 1000, 1),
+                "DB p95 ms": round(_percentile(dbs, 95) * 1000, 1),
+                "CPU p50 ms": round(_percentile(cpus, 50) * 1000, 1),
+                "CPU p95 ms": round(_percentile(cpus, 95) * 1000, 1),
+                "Elementy (śr.)": round(sum(elements) / len(elements), 1),
+            })
+        return rows
+
+
+RENDER_STATS = RenderStats()
+
+
+def _element_count() -> int:
+    """Top-level elements emitted so far in this rerun (0 outside a Streamlit run)"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        if ctx is None:
+            return 0
+        return sum(getattr(cursor, "index", 0) for cursor in ctx.cursors.values())
+    except Exception:
+        return 0
+
+
+@contextmanager
+def profile_section(page: str, section: str = "strona"):
+    """Record wall/DB/CPU time and element count of the block"""
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    db_start = db_seconds()
+    elements_start = _element_count()
+    try:
+        yield
+    finally:
+        RENDER_STATS.record(
+            page,
+            section,
+            time.perf_counter() - wall_start,
+            db_seconds() - db_start,
+            time.thread_time() - cpu_start,
+            _element_count() - elements_start,
+        )
+
+
+def profiling_requested() -> bool:
+    """True if this rerun should be profiled"""
+    if os.getenv("PROFILE_PAGES") == "1":
+        return True
+    token = os.getenv("PROFILE_TOKEN")
+    if not token:
+        return False
+    try:
+        return st.query_params.get("profile") == token
+    except Exception:
+        return False
+
+
+@contextmanager
+def _capture_profile(page: str):
+    """Profile the block and show the report below the page"""
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        Profiler = None
+    
+    if Profiler is not None:
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            report = profiler.output_text(unicode=True, color=False)
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(40)
+            report = stream.getvalue()
+    
+    with st.expander(f"🔬 Profil: {page}", expanded=False):
+        st.code(report, language=None)
+
+
+@contextmanager
+def profile_page(page: str, section: str = "strona"):
+    """Time a whole page (or fragment) rerun, DB time counted from here, and profile it if requested"""
+    with db_time_counter():
+        if profiling_requested():
+            with _capture_profile(page), profile_section(page, section):
+                yield
+        else:
+            with profile_section(page, section):
+                yield
@@ -0,0 +1,81 @@
+"""
+Admin page - history export and server diagnostics for the treasurer
+
+Not in the main navigation: opened with ?admin=1 in the URL and protected
+by the treasurer password.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+import streamlit as st
+import pandas as pd
+from src.database import SupabaseDB
+from src.page_profiler import RENDER_STATS
+from src.pages.payments import treasurer_login
+
+# Largest export offered for download (Streamlit holds download data in memory)
+DOWNLOAD_MAX_BYTES = int(os.getenv("EXPORT_DOWNLOAD_MAX_MB", "50")) * 2**20
+
+
+def export_history_archive(db: SupabaseDB, zip_path: Path) -> dict:
+    """Zip of Parquet files with the whole history, streamed from the database in chunks to zip_path"""
+    from src.utils.parquet_history import export_archive  # pyarrow only when exporting
+    try:
+        with db.read_snapshot() as connection:
+            return export_archive(
+                lambda query, chunk_rows: db.stream_chunks(query, itersize=chunk_rows, connection=connection),
+                zip_path
+            )
+    except Exception as e:
+        st.error(f"Błąd eksportu historii: {e}")
+        return None
+
+
+def admin_page(db: SupabaseDB):
+    """Admin page"""
+    st.header("🛠️ Administracja")
+    
+    if not treasurer_login():
+        return
+    
+    # Full history export
+    st.subheader("📦 Eksport historii")
+    
+    if st.button("Przygotuj eksport (Parquet)", key="prepare_export"):
+        with tempfile.TemporaryDirectory() as tmp:
+            zip_path = Path(tmp) / "parkowa_historia.zip"
+            with st.spinner("Eksportowanie historii..."):
+                counts = export_history_archive(db, zip_path)
+            if counts is not None:
+                st.caption(", ".join(f"{table}: {count}" for table, count in counts.items()))
+                size = zip_path.stat().st_size
+                if size > DOWNLOAD_MAX_BYTES:
+                    # Streamlit keeps download data in memory - full backups go through the CLI
+                    st.warning(
+                        f"Eksport ma {size / 2**20:.0f} MB, więcej niż limit pobierania "
+                        f"({DOWNLOAD_MAX_BYTES / 2**20:.0f} MB). Pełną kopię zrób poleceniem "
+                        "`python history_io.py export <katalog>`."
+                    )
+                else:
+                    with open(zip_path, 'rb') as file:
+                        st.download_button(
+                            "⬇️ Pobierz historię (.zip)",
+                            data=file,
+                            file_name="parkowa_historia.zip",
+                            mime="application/zip",
+                            key="download_export"
+                        )
+    
+    st.markdown("---")
+    
+    # Render timings of all pages
+    st.subheader("📈 Wydajność stron")
+    
+    if st.button("⏱️ Pokaż czasy renderowania", key="show_render_stats"):
+        render_stats = RENDER_STATS.summary()
+        
+        if render_stats:
+            st.dataframe(pd.DataFrame(render_stats), width='stretch', hide_index=True)
+        else:
+            st.info("Brak pomiarów od uruchomienia serwera.")
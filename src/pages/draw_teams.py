@@ -8,10 +8,10 @@ from src.database import SupabaseDB
 from src.constants import TIMEZONE
 from src.utils.datetime_utils import is_draw_time_allowed, parse_game_time
 from src.utils.game_utils import get_active_games
-from src.utils.signup_utils import get_signups_for_game
+from src.utils.signup_utils import get_signups_for_game, split_reserves
 from src.utils.team_utils import draw_teams, is_valid_player_count
 from src.utils.teams_db import save_teams, get_teams_for_game
-from src.game_config import DRAW_NOT_AVAILABLE_MESSAGE, MANUAL_DRAW_MESSAGE
+from src.game_config import get_config
 
 
 def display_teams(teams_dict: dict):
@@ -56,7 +56,7 @@ def draw_page(db: SupabaseDB):
     
     # Check if draw time is allowed
     if not is_draw_time_allowed():
-        st.warning(DRAW_NOT_AVAILABLE_MESSAGE)
+        st.warning(get_config().draw_not_available_message)
         return
     
     # Get active games
@@ -70,11 +70,15 @@ def draw_page(db: SupabaseDB):
         game_time = parse_game_time(game['start_time'])
         st.subheader(f"Gierka: {game_time.strftime('%d.%m.%Y %H:%M')}")
         
-        signups = get_signups_for_game(db, game['id'])
+        # Only the main squad is drawn; reserves come in through sign-outs
+        signups, reserves = split_reserves(get_signups_for_game(db, game['id']))
         num_players = len(signups)
         
         st.info(f"Zapisanych graczy: {num_players}")
+        if reserves:
+            st.caption("Rezerwa: " + ", ".join(signup['nickname'] for signup in reserves))
         
+        saved_teams = None
         if is_valid_player_count(num_players):
             if st.button(f"Wylosuj składy dla {num_players} graczy", key=f"draw_{game['id']}"):
                 players = [signup['nickname'] for signup in signups]
@@ -82,19 +86,21 @@ def draw_page(db: SupabaseDB):
                 
                 if save_teams(db, game['id'], teams):
                     st.success("Składy wylosowane pomyślnie!")
+                    saved_teams = teams
         else:
-            st.error(MANUAL_DRAW_MESSAGE)
+            st.error(get_config().manual_draw_message)
         
-        # Show current lineups if they exist
-        teams = get_teams_for_game(db, game['id'])
-        if teams:
-            st.subheader("Wylosowane składy:")
-            
+        # Show current lineups (just drawn ones need no refetch)
+        if saved_teams:
+            teams_dict = saved_teams
+        else:
             # Group by colors
             teams_dict = {}
-            for team in teams:
+            for team in get_teams_for_game(db, game['id']):
                 teams_dict[team['team_color']] = team['players']
-            
+        
+        if teams_dict:
+            st.subheader("Wylosowane składy:")
             display_teams(teams_dict)
         
         st.divider()
@@ -3,14 +3,14 @@ Game history page
 """
 
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 from src.database import SupabaseDB
 from src.constants import TIMEZONE
 from src.utils.game_utils import get_past_games
-from src.utils.signup_utils import get_signups_for_game
+from src.utils.signup_utils import get_signups_for_game, signups_to_dataframe
 from src.utils.teams_db import get_teams_for_game
-from src.utils.datetime_utils import parse_game_time, parse_timestamp
+from src.utils.datetime_utils import parse_game_time
+from src.page_profiler import profile_section
 
 
 def display_history_teams(teams_dict: dict):
@@ -69,27 +69,21 @@ def get_historical_games(db: SupabaseDB):
 def load_game_details(db: SupabaseDB, game_id: str, game_time_str: str):
     """Load detailed information for a specific game"""
     try:
-        with st.spinner(f"Ładowanie szczegółów gierki z {game_time_str}..."):
+        with st.spinner(f"Ładowanie szczegółów gierki z {game_time_str}..."), \
+                profile_section("history_page", "szczegóły gierki"):
             # List of signups
-            signups = get_signups_for_game(db, game_id)
+            signups = get_signups_for_game(db, game_id, include_archive=True)
             
             if signups:
                 st.subheader("Lista zapisanych:")
-                df = pd.DataFrame([
-                    {
-                        "Lp.": i+1,
-                        "Nickname": signup['nickname'],
-                        "Czas zapisu": parse_timestamp(signup['timestamp']).strftime('%d.%m.%Y %H:%M:%S')
-                    }
-                    for i, signup in enumerate(signups)
-                ])
+                df = signups_to_dataframe(signups)
                 st.dataframe(df, width='stretch', hide_index=True)
                 st.info(f"Łącznie: {len(signups)} osób")
             else:
                 st.info("Brak zapisów.")
             
             # Team lineups
-            teams = get_teams_for_game(db, game_id)
+            teams = get_teams_for_game(db, game_id, include_archive=True)
             if teams:
                 st.subheader("Składy drużyn:")
                 
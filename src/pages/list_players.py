@@ -2,20 +2,126 @@
 Page for listing signed up players for each game
 """
 
+import time
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 from src.database import SupabaseDB
 from src.constants import TIMEZONE
 from src.utils.game_utils import get_active_games
-from src.utils.signup_utils import get_signups_for_game
-from src.utils.datetime_utils import parse_game_time, parse_timestamp
+from src.utils.signup_utils import get_signups_for_game, get_signups_version, signups_to_dataframe, split_reserves
+from src.utils.datetime_utils import parse_game_time
+from src.utils.snapshots import get_snapshot_url
+from src.page_profiler import profile_section
+from src.rerun import page_fragment
+from src.game_config import get_config
+
+
+def display_signups(signups: list):
+    """Displays the signup table of a game: main squad, then the reserve list"""
+    if not signups:
+        st.info("Brak zapisów na tę gierkę.")
+        return
+    
+    main_squad, reserves = split_reserves(signups)
+    st.dataframe(signups_to_dataframe(main_squad), width='stretch', hide_index=True)
+    
+    capacity = signups[0].get('capacity')
+    if capacity:
+        st.info(f"Skład: {len(main_squad)}/{capacity} osób")
+    else:
+        st.info(f"Łącznie zapisanych: {len(signups)} osób")
+    
+    if reserves:
+        st.markdown(f"**Lista rezerwowa ({len(reserves)})**")
+        st.dataframe(signups_to_dataframe(reserves), width='stretch', hide_index=True)
+
+
+@page_fragment("list_page")
+def signups_table(db: SupabaseDB, game: dict):
+    """Signup table of one game - refreshing reruns only this fragment"""
+    with profile_section("list_page", "tabela"):
+        display_signups(get_signups_for_game(db, game['id']))
+        st.button("🔄 Odśwież", key=f"refresh_{game['id']}")
+
+
+def reset_live_state(state_key: str = None):
+    """Forget live list state of one game or all games (polling restarts at the shortest interval)"""
+    for key in [key for key in st.session_state if str(key).startswith("live_state_")]:
+        if state_key is None or key == state_key:
+            del st.session_state[key]
+
+
+def touch_live_state():
+    """Record user activity for all live lists
+
+    Called from full page reruns, which only happen on interaction
+    (run_every reruns just the fragment), so the idle stop counts from
+    the last interaction anywhere in the app.
+    """
+    now = time.time()
+    for key in [key for key in st.session_state if str(key).startswith("live_state_")]:
+        st.session_state[key]['last_interaction'] = now
+
+
+# The fragment's rerun tick is fixed at import; backoff and idle limits follow config reloads
+@page_fragment("list_page", run_every=get_config().live_list.poll_seconds)
+def live_signups_table(db: SupabaseDB, game: dict):
+    """Live signup table of one game
+    
+    Reruns every live_list.poll_seconds but only checks the game's signups
+    version when its (backed off) poll time has come, and fetches the list
+    only if the version changed. Polling stops after a period without
+    interaction (see touch_live_state) until "Odśwież" is clicked or the
+    user interacts with the app again.
+    """
+    live_list = get_config().live_list
+    state_key = f"live_state_{game['id']}"
+    now = time.time()
+    state = st.session_state.get(state_key)
+    if state is None:
+        state = st.session_state[state_key] = {
+            'version': None,
+            'signups': [],
+            'interval': live_list.poll_seconds,
+            'next_poll': 0.0,
+            'last_interaction': now,
+        }
+    
+    idle = now - state['last_interaction'] > live_list.idle_stop_minutes * 60
+    
+    with profile_section("list_page", "tabela na żywo"):
+        if not idle and now >= state['next_poll']:
+            # The default capacity (hot-reloaded YAML) changes reserve flags without a new version
+            version = get_signups_version(db, game['id'])
+            if version is not None:
+                version = (version, get_config().default_max_players)
+            if version is None or version != state['version']:
+                state['signups'] = get_signups_for_game(db, game['id'])
+                state['version'] = version
+                state['interval'] = live_list.poll_seconds
+            else:
+                # Nothing changed - check less often
+                state['interval'] = min(state['interval'] * live_list.backoff_factor, live_list.max_poll_seconds)
+            state['next_poll'] = now + state['interval']
+        
+        display_signups(state['signups'])
+    
+    if idle:
+        st.caption("⏸️ Automatyczne odświeżanie wstrzymane - kliknij „Odśwież”, aby wznowić.")
+    else:
+        st.caption(f"🔴 Na żywo - sprawdzanie zmian co {state['interval']:.0f} s")
+    
+    st.button("🔄 Odśwież", key=f"live_refresh_{game['id']}", on_click=reset_live_state, args=(state_key,))
 
 
 def list_page(db: SupabaseDB):
     """Page with list of signed up players"""
     st.header("📋 Lista zapisanych")
     
+    live = st.toggle("🔴 Lista na żywo", key="live_list_mode", on_change=reset_live_state)
+    if live:
+        touch_live_state()
+    
     # Get active games
     active_games = get_active_games(db)
     
@@ -27,20 +133,14 @@ def list_page(db: SupabaseDB):
         game_time = parse_game_time(game['start_time'])
         st.subheader(f"Gierka: {game_time.strftime('%d.%m.%Y %H:%M')}")
         
-        signups = get_signups_for_game(db, game['id'])
+        # Read-only viewers can use the static snapshot instead of this session
+        snapshot_url = get_snapshot_url(game['id'])
+        if snapshot_url:
+            st.markdown(f"[📄 Lekka wersja listy (odświeża się sama)]({snapshot_url})")
         
-        if signups:
-            df = pd.DataFrame([
-                {
-                    "Lp.": i+1,
-                    "Nickname": signup['nickname'],
-                    "Czas zapisu": parse_timestamp(signup['timestamp']).strftime('%d.%m.%Y %H:%M:%S')
-                }
-                for i, signup in enumerate(signups)
-            ])
-            st.dataframe(df, width='stretch', hide_index=True)
-            st.info(f"Łącznie zapisanych: {len(signups)} osób")
+        if live:
+            live_signups_table(db, game)
         else:
-            st.info("Brak zapisów na tę gierkę.")
+            signups_table(db, game)
         
         st.divider()
@@ -2,13 +2,15 @@
 Payments management page for treasurer
 """
 
+import hmac
 import streamlit as st
 import pandas as pd
+from psycopg2 import sql
 from src.database import SupabaseDB
 from src.constants import TIMEZONE
 from src.game_config import TREASURER_PASSWORD, BLIK_NUMBER
-from src.utils.signup_utils import get_signups_for_game
 from src.utils.datetime_utils import parse_game_time
+from src.utils.security import RateLimiter, log_security_event
 
 
 def add_payment_column_if_not_exists(db: SupabaseDB):
@@ -29,55 +31,56 @@ def add_payment_column_if_not_exists(db: SupabaseDB):
         st.error(f"Błąd przy dodawaniu kolumny płatności: {e}")
 
 
-def get_payment_status_for_game(db: SupabaseDB, game_id: str):
-    """Get payment status for all players in a game"""
+@st.cache_data(ttl=300)  # Cache for 5 minutes, cleared after saving payments
+def get_payment_rows_for_game(_db: SupabaseDB, game_id: str):
+    """Get signups of a game with their payment status (only the columns the form needs)"""
     try:
         query = """
-            SELECT nickname, paid
-            FROM signups
+            SELECT nickname, COALESCE(paid, FALSE) AS paid
+            FROM signups_all
             WHERE game_id = %s
-            ORDER BY nickname
+            ORDER BY timestamp
         """
-        result = db.execute_query(query, (game_id,))
-        return {row['nickname']: row['paid'] for row in result} if result else {}
+        result = _db.execute_query(query, (game_id,))
+        return result if result else []
     except Exception as e:
         st.error(f"Błąd pobierania statusu płatności: {e}")
-        return {}
+        return []
 
 
 def batch_update_payments(db: SupabaseDB, game_id: str, payment_updates: dict):
-    """Update payment status for multiple players in a single transaction"""
+    """Update payment status for multiple players in a single statement
+
+    Returns the updated rows ({'nickname', 'paid'}) or an empty list.
+    """
     try:
-        query = """
-            UPDATE signups 
-            SET paid = %s 
-            WHERE game_id = %s AND nickname = %s
-        """
+        query = sql.SQL("""
+            UPDATE signups_all AS s
+            SET paid = v.paid
+            FROM (VALUES %s) AS v(nickname, paid)
+            WHERE s.game_id = {game_id} AND s.nickname = v.nickname
+            RETURNING s.nickname, s.paid
+        """).format(game_id=sql.Literal(game_id))
         
-        # Prepare all updates
-        updates = []
-        for nickname, paid in payment_updates.items():
-            updates.append((paid, game_id, nickname))
+        updates = [(nickname, paid) for nickname, paid in payment_updates.items()]
         
-        # Execute all updates using SupabaseDB's execute_many method
-        affected_rows = db.execute_many(query, updates)
+        # One UPDATE ... FROM (VALUES ...) round trip for the whole form
+        updated_rows = db.execute_values(query, updates, template="(%s, %s::boolean)")
         
-        if affected_rows > 0:
-            return True
-        else:
+        if not updated_rows:
             st.warning("Nie zaktualizowano żadnych rekordów")
-            return False
+        return updated_rows
         
     except Exception as e:
         st.error(f"Błąd aktualizacji płatności: {e}")
-        return False
+        return []
 
 
 def get_past_inactive_games(db: SupabaseDB):
     """Get inactive games that already ended (start_time < now)"""
     try:
         query = """
-            SELECT id, start_time
+            SELECT id, start_time, cost_per_player
             FROM games 
             WHERE active = FALSE 
             AND start_time < CURRENT_TIMESTAMP
@@ -91,17 +94,20 @@ def get_past_inactive_games(db: SupabaseDB):
 
 
 def get_debtors_summary(db: SupabaseDB):
-    """Get summary of players who haven't paid for past games"""
+    """Get summary of players who haven't paid for past games
+
+    Reads the player_balances ledger, which triggers keep up to date when a
+    game is charged or a payment flag changes (migrations/003_player_balances.sql,
+    keyed by player since 007_players.sql). The scheduler charges closed
+    games once their start time has passed (011_games_charged.sql).
+    """
     try:
         query = """
-            SELECT s.nickname, COUNT(*) as unpaid_games
-            FROM signups s
-            JOIN games g ON s.game_id = g.id
-            WHERE s.paid = FALSE 
-            AND g.start_time < CURRENT_TIMESTAMP
-            AND g.active = FALSE
-            GROUP BY s.nickname
-            ORDER BY unpaid_games DESC
+            SELECT p.nickname, b.unpaid_games, b.amount_due
+            FROM player_balances b
+            JOIN players p ON p.id = b.player_id
+            WHERE b.unpaid_games > 0
+            ORDER BY b.unpaid_games DESC
         """
         result = db.execute_query(query)
         return result if result else []
@@ -110,15 +116,25 @@ def get_debtors_summary(db: SupabaseDB):
         return []
 
 
-def payments_page(db: SupabaseDB):
-    """Main payments management page"""
-    st.header("💰 Rozliczenia")
-    
-    # Payment info for everyone
-    st.info(f"📱 **Numer do przelewów BLIK:** {BLIK_NUMBER}")
-    st.markdown("---")
+def update_game_cost(db: SupabaseDB, game_id: str, cost_per_player: float):
+    """Set the per-player cost of a game (ledger amounts follow via trigger)"""
+    try:
+        db.execute_query(
+            "UPDATE games SET cost_per_player = %s WHERE id = %s",
+            (cost_per_player, game_id)
+        )
+        return True
+    except Exception as e:
+        st.error(f"Błąd aktualizacji kosztu gierki: {e}")
+        return False
+
+
+def treasurer_login() -> bool:
+    """Treasurer login form, or a logout button once logged in; True when logged in"""
+    if not TREASURER_PASSWORD:
+        st.error("🔒 Hasło skarbnika nie jest skonfigurowane (treasurer_password w Streamlit secrets).")
+        return False
     
-    # Password protection
     if 'treasurer_authenticated' not in st.session_state:
         st.session_state.treasurer_authenticated = False
     
@@ -127,18 +143,39 @@ def payments_page(db: SupabaseDB):
         password = st.text_input("Wprowadź hasło skarbnika:", type="password")
         
         if st.button("Zaloguj"):
-            if password == TREASURER_PASSWORD:
+            # Every attempt takes a token - a few tries, then a cooldown
+            if not RateLimiter.check_signup_rate_limit("treasurer_login", 5, 15):
+                cooldown = RateLimiter.get_remaining_cooldown("treasurer_login", 15, 5)
+                st.error(f"⏰ Za dużo prób logowania. Spróbuj ponownie za {cooldown} sekund.")
+                log_security_event("rate_limit", "treasurer login attempts exceeded")
+            elif hmac.compare_digest(password.encode(), TREASURER_PASSWORD.encode()):
                 st.session_state.treasurer_authenticated = True
+                log_security_event("treasurer_login", "successful")
                 st.success("Zalogowano pomyślnie!")
                 st.rerun()
             else:
+                log_security_event("treasurer_login_failed", "invalid password")
                 st.error("Nieprawidłowe hasło!")
-        return
+        return False
     
     # Logout button
     if st.button("🚪 Wyloguj", key="logout"):
         st.session_state.treasurer_authenticated = False
         st.rerun()
+    return True
+
+
+def payments_page(db: SupabaseDB):
+    """Main payments management page"""
+    st.header("💰 Rozliczenia")
+    
+    # Payment info for everyone
+    st.info(f"📱 **Numer do przelewów BLIK:** {BLIK_NUMBER}")
+    st.markdown("---")
+    
+    # Password protection
+    if not treasurer_login():
+        return
     
     # Past games management - MOVED UP
     st.subheader("🕒 Zarządzanie płatnościami")
@@ -151,11 +188,13 @@ def payments_page(db: SupabaseDB):
     
     # Game selection
     game_options = {}
+    game_costs = {}
     for game in past_games:
         game_time = parse_game_time(game['start_time'])
         game_time_local = game_time.astimezone(TIMEZONE)
         display_time = game_time_local.strftime('%d.%m.%Y %H:%M')
         game_options[display_time] = game['id']
+        game_costs[game['id']] = float(game.get('cost_per_player') or 0)
     
     selected_display = st.selectbox(
         "Wybierz gierkę:",
@@ -165,29 +204,40 @@ def payments_page(db: SupabaseDB):
     if selected_display:
         selected_game_id = game_options[selected_display]
         
-        # Get signups for selected game
-        signups = get_signups_for_game(db, selected_game_id)
+        # Per-player cost of the selected game
+        current_cost = game_costs.get(selected_game_id, 0.0)
+        new_cost = st.number_input(
+            "Koszt na osobę (zł):",
+            min_value=0.0,
+            step=1.0,
+            value=current_cost,
+            key=f"cost_{selected_game_id}"
+        )
+        if new_cost != current_cost and st.button("💾 Zapisz koszt", key=f"save_cost_{selected_game_id}"):
+            if update_game_cost(db, selected_game_id, new_cost):
+                st.success("✅ Zaktualizowano koszt gierki")
+                st.rerun()
+        
+        # Signups with payment status for selected game (one cached query)
+        signups = get_payment_rows_for_game(db, selected_game_id)
         
         if signups:
             st.subheader(f"💳 Płatności dla gierki {selected_display}")
             
             # Create form to prevent UI reloading on checkbox changes
             with st.form(key=f"payments_form_{selected_game_id}"):
-                # Get current payment status
-                payment_status = get_payment_status_for_game(db, selected_game_id)
-                
                 # Simple list with checkboxes
                 st.write("**Zaznacz graczy, którzy zapłacili:**")
                 
                 payment_updates = {}
                 for signup in signups:
                     nickname = signup['nickname']
-                    current_paid = payment_status.get(nickname, False)
+                    current_paid = signup['paid']
                     
                     new_paid = st.checkbox(
                         f"{nickname}",
                         value=current_paid,
-                        key=f"payment_{nickname}"
+                        key=f"payment_{selected_game_id}_{nickname}"
                     )
                     
                     # Track changes
@@ -200,8 +250,10 @@ def payments_page(db: SupabaseDB):
                 if submitted:
                     if payment_updates:
                         with st.spinner("Zapisywanie zmian..."):
-                            if batch_update_payments(db, selected_game_id, payment_updates):
-                                st.success(f"✅ Zaktualizowano płatności dla {len(payment_updates)} graczy")
+                            updated_rows = batch_update_payments(db, selected_game_id, payment_updates)
+                            if updated_rows:
+                                get_payment_rows_for_game.clear()
+                                st.success(f"✅ Zaktualizowano płatności dla {len(updated_rows)} graczy")
                                 st.rerun()
                             else:
                                 st.error("❌ Błąd podczas aktualizacji płatności")
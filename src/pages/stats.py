@@ -0,0 +1,75 @@
+"""
+Player statistics page
+"""
+
+import streamlit as st
+from src.database import SupabaseDB
+from src.utils.datetime_utils import parse_timestamp
+from src.page_profiler import profile_section
+
+TOP_TEAMMATES = 3
+
+
+@st.cache_data(ttl=600)  # Summary tables change only when the scheduler closes a game
+def get_player_stats(_db: SupabaseDB):
+    """Per-player statistics from the summary tables (migrations/008_player_stats.sql)"""
+    try:
+        query = """
+            SELECT p.nickname, s.games_played, s.current_streak, s.longest_streak,
+                   s.first_played_at, s.last_played_at, top.teammates
+            FROM player_stats s
+            JOIN players p ON p.id = s.player_id
+            LEFT JOIN LATERAL (
+                SELECT string_agg(tp.nickname || ' (' || t.games_together || ')', ', '
+                                  ORDER BY t.games_together DESC, tp.nickname) AS teammates
+                FROM (
+                    SELECT teammate_id, games_together
+                    FROM player_teammates
+                    WHERE player_id = s.player_id
+                    ORDER BY games_together DESC
+                    LIMIT %s
+                ) t
+                JOIN players tp ON tp.id = t.teammate_id
+            ) top ON TRUE
+            WHERE s.games_played > 0
+            ORDER BY s.games_played DESC, p.nickname
+        """
+        result = _db.execute_query(query, (TOP_TEAMMATES,))
+        return result if result else []
+    except Exception as e:
+        st.error(f"Błąd pobierania statystyk graczy: {e}")
+        return []
+
+
+def stats_to_dataframe(stats: list):
+    """Builds the statistics table (pandas DataFrame)"""
+    import pandas as pd  # Imported on first use, not at app start
+    return pd.DataFrame([
+        {
+            "Gracz": row['nickname'],
+            "Gierki": row['games_played'],
+            "Seria": row['current_streak'],
+            "Najdłuższa seria": row['longest_streak'],
+            "Ostatnio": parse_timestamp(row['last_played_at']).strftime('%d.%m.%Y') if row['last_played_at'] else "",
+            "Najczęściej w drużynie z": row['teammates'] or "",
+        }
+        for row in stats
+    ])
+
+
+def stats_page(db: SupabaseDB):
+    """Player statistics page"""
+    st.header("📊 Statystyki graczy")
+    
+    with profile_section("stats_page", "tabela"):
+        stats = get_player_stats(db)
+        
+        if not stats:
+            st.info("Brak statystyk - pojawią się po pierwszej rozegranej gierce.")
+            return
+        
+        st.dataframe(stats_to_dataframe(stats), width='stretch', hide_index=True)
+        st.caption(
+            "Seria - ile kolejnych gierek (do ostatniej) gracz zagrał. "
+            "Statystyki aktualizują się po zamknięciu gierki."
+        )
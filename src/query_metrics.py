@@ -0,0 +1,329 @@
+"""
+Query instrumentation: latency histograms, slow-query log and Prometheus export
+
+Every statement run through SupabaseDB is recorded per phase (connect,
+execute, fetch), per statement fingerprint and per caller tag (the page
+that issued it, set with query_tag()). Configuration (environment):
+  - SLOW_QUERY_MS: log statements slower than this (default 500)
+  - METRICS_PORT: serve /metrics in Prometheus text format on 127.0.0.1
+  - METRICS_FILE: periodically write the same text to this file
+  - METRICS_FILE_INTERVAL: seconds between file writes (default 15)
+  - APP_ENV: "development" or "test" makes per-rerun query budgets fatal
+
+track_queries() counts the statements of one rerun of a page, flags N+1
+patterns (the same statement repeated) and enforces a query budget.
+"""
+
+import os
+import re
+import time
+import hashlib
+import logging
+import threading
+import contextvars
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("parkowa.slow_query")
+budget_logger = logging.getLogger("parkowa.query_budget")
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, float("inf"))
+
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_MS", "500")) / 1000
+
+STRICT_QUERY_BUDGETS = os.getenv("APP_ENV", "production") in ("development", "test")
+
+_caller = contextvars.ContextVar("query_caller", default="unknown")
+_tracker = contextvars.ContextVar("rerun_query_tracker", default=None)
+_db_seconds = contextvars.ContextVar("db_seconds", default=None)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_KEYWORD_LITERAL = re.compile(r"\b(?:true|false|null)\b", re.IGNORECASE)
+_VALUES_ROW = r"\(\s*\?(?:::\w+)?(?:\s*,\s*\?(?:::\w+)?)*\s*\)"
+_VALUES_LIST = re.compile(rf"{_VALUES_ROW}(?:\s*,\s*{_VALUES_ROW})*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@contextmanager
+def query_tag(caller: str):
+    """Attribute queries issued inside the block to `caller` (e.g. a page name)"""
+    token = _caller.set(caller)
+    try:
+        yield
+    finally:
+        _caller.reset(token)
+
+
+def current_caller() -> str:
+    """Caller tag of the running code"""
+    return _caller.get()
+
+
+@contextmanager
+def db_time_counter():
+    """Accumulate database time (all phases) of the block; read it with db_seconds()"""
+    token = _db_seconds.set([0.0])
+    try:
+        yield
+    finally:
+        _db_seconds.reset(token)
+
+
+def db_seconds() -> float:
+    """Database time so far inside the innermost db_time_counter()"""
+    counter = _db_seconds.get()
+    return counter[0] if counter is not None else 0.0
+
+
+class QueryBudgetExceeded(Exception):
+    """A page issued more statements in one rerun than its budget allows"""
+
+
+class RerunQueryTracker:
+    """Statements issued during one rerun of a page"""
+    
+    def __init__(self, name: str, budget: int = None, n_plus_one_threshold: int = 3):
+        self.name = name
+        self.budget = budget
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.counts = Counter()
+        self.statements = {}
+    
+    def record(self, query_id: str, statement: str):
+        self.counts[query_id] += 1
+        self.statements[query_id] = statement
+    
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+    
+    def n_plus_one(self) -> list:
+        """(count, statement) of statements repeated at least n_plus_one_threshold times"""
+        return [
+            (count, self.statements[query_id])
+            for query_id, count in self.counts.most_common()
+            if count >= self.n_plus_one_threshold
+        ]
+    
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.total > self.budget
+
+
+@contextmanager
+def track_queries(name: str, budget: int = None, n_plus_one_threshold: int = 3, strict: bool = None):
+    """Count statements issued inside the block (one page rerun)
+    
+    N+1 patterns and budget overruns are logged; with strict (default:
+    APP_ENV is development/test) exceeding the budget raises QueryBudgetExceeded.
+    """
+    strict = STRICT_QUERY_BUDGETS if strict is None else strict
+    tracker = RerunQueryTracker(name, budget, n_plus_one_threshold)
+    token = _tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _tracker.reset(token)
+    
+    for count, statement in tracker.n_plus_one():
+        budget_logger.warning(f"🔁 Możliwe N+1 w {name}: {count}× {statement[:200]}")
+    
+    if tracker.over_budget():
+        message = f"{name} wykonał {tracker.total} zapytań (limit {tracker.budget})"
+        if strict:
+            raise QueryBudgetExceeded(message)
+        budget_logger.warning(f"📈 {message}")
+
+
+def track_statement(query_id: str, statement: str):
+    """Report an executed statement to the rerun tracker, if any"""
+    tracker = _tracker.get()
+    if tracker is not None:
+        tracker.record(query_id, statement)
+
+
+def normalize_statement(query: str) -> str:
+    """Statement text with literals, parameters and VALUES lists collapsed"""
+    text = _STRING_LITERAL.sub("?", query)
+    text = _NUMBER_LITERAL.sub("?", text)
+    text = _KEYWORD_LITERAL.sub("?", text)
+    text = text.replace("%s", "?")
+    text = _VALUES_LIST.sub("(?), ...", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def fingerprint(query: str) -> tuple:
+    """(short id, normalized statement) of a query"""
+    statement = normalize_statement(query)
+    return hashlib.sha1(statement.encode("utf-8")).hexdigest()[:10], statement
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram"""
+    
+    __slots__ = ("counts", "total", "count")
+    
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+    
+    def observe(self, seconds: float):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.total += seconds
+        self.count += 1
+
+
+class QueryMetrics:
+    """Thread-safe store of per-query metrics"""
+    
+    def __init__(self):
+        self.histograms = {}    # (phase, caller, query_id) -> Histogram
+        self.rows = {}          # (caller, query_id) -> rows returned
+        self.statements = {}    # query_id -> normalized statement
+        self.slow_queries = 0
+        self._lock = threading.Lock()
+    
+    def observe(self, phase: str, seconds: float, query_id: str = "", statement: str = None,
+                rows: int = None, caller: str = None):
+        caller = caller or current_caller()
+        counter = _db_seconds.get()
+        if counter is not None:
+            counter[0] += seconds
+        with self._lock:
+            key = (phase, caller, query_id)
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+            if statement is not None:
+                self.statements[query_id] = statement
+            if rows is not None:
+                self.rows[(caller, query_id)] = self.rows.get((caller, query_id), 0) + rows
+    
+    def check_slow(self, seconds: float, query_id: str, rows: int = None):
+        """Log a statement whose execute (+fetch) time exceeded the threshold"""
+        if seconds < SLOW_QUERY_SECONDS:
+            return
+        with self._lock:
+            self.slow_queries += 1
+            statement = self.statements.get(query_id, "")
+        logger.warning(
+            f"🐢 Wolne zapytanie {seconds * 1000:.0f} ms [{current_caller()}] "
+            f"rows={rows if rows is not None else '-'} {query_id}: {statement[:300]}"
+        )
+    
+    def render_prometheus(self) -> str:
+        """All metrics in Prometheus text exposition format"""
+        with self._lock:
+            histograms = list(self.histograms.items())
+            rows = list(self.rows.items())
+            statements = list(self.statements.items())
+            slow_queries = self.slow_queries
+        
+        lines = [
+            "# HELP db_query_duration_seconds Database time per phase (connect, execute, fetch).",
+            "# TYPE db_query_duration_seconds histogram",
+        ]
+        for (phase, caller, query_id), histogram in sorted(histograms):
+            labels = f'phase="{phase}",caller="{_escape(caller)}",query="{query_id}"'
+            cumulative = 0
+            for bound, count in zip(BUCKETS, histogram.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'db_query_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"db_query_duration_seconds_sum{{{labels}}} {histogram.total:.6f}")
+            lines.append(f"db_query_duration_seconds_count{{{labels}}} {histogram.count}")
+        
+        lines += [
+            "# HELP db_query_rows_total Rows returned by fetches.",
+            "# TYPE db_query_rows_total counter",
+        ]
+        for (caller, query_id), total in sorted(rows):
+            lines.append(f'db_query_rows_total{{caller="{_escape(caller)}",query="{query_id}"}} {total}')
+        
+        lines += [
+            "# HELP db_query_info Normalized statement text of each query fingerprint.",
+            "# TYPE db_query_info gauge",
+        ]
+        for query_id, statement in sorted(statements):
+            lines.append(f'db_query_info{{query="{query_id}",statement="{_escape(statement)}"}} 1')
+        
+        lines += [
+            "# HELP db_slow_queries_total Statements slower than SLOW_QUERY_MS.",
+            "# TYPE db_slow_queries_total counter",
+            f"db_slow_queries_total {slow_queries}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+METRICS = QueryMetrics()
+
+
+def write_metrics_file(path: str):
+    """Atomically write current metrics to a file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        file.write(METRICS.render_prometheus())
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = METRICS.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+_exporter_started = False
+_exporter_lock = threading.Lock()
+
+
+def start_metrics_exporter():
+    """Start the /metrics endpoint and/or file writer configured in the environment (once)"""
+    global _exporter_started
+    with _exporter_lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+    
+    port = os.getenv("METRICS_PORT")
+    if port:
+        try:
+            server = ThreadingHTTPServer(("127.0.0.1", int(port)), _MetricsHandler)
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        except OSError as e:
+            logger.warning(f"Nie można uruchomić endpointu metryk na porcie {port}: {e}")
+    
+    path = os.getenv("METRICS_FILE")
+    if path:
+        interval = float(os.getenv("METRICS_FILE_INTERVAL", "15"))
+        
+        def write_periodically():
+            while True:
+                time.sleep(interval)
+                try:
+                    write_metrics_file(path)
+                except OSError as e:
+                    logger.warning(f"Nie można zapisać metryk do {path}: {e}")
+        
+        threading.Thread(target=write_periodically, name="metrics-file", daemon=True).start()
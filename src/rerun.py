@@ -0,0 +1,48 @@
+"""
+Per-rerun context shared by full page runs and fragment reruns
+
+A full rerun of app.py wraps the selected page in page_context(). Functions
+decorated with page_fragment() rerun on their own (st.fragment); when they
+do, they get the same context: query tag, query budget, read cache and
+render timing.
+"""
+
+import functools
+import contextvars
+from contextlib import contextmanager
+import streamlit as st
+from src.database import rerun_read_cache
+from src.game_config import get_config
+from src.page_profiler import profile_page
+from src.query_metrics import query_tag, track_queries
+
+_active_page = contextvars.ContextVar("active_page", default=None)
+
+
+@contextmanager
+def page_context(page_name: str, section: str = "strona"):
+    """Tag, count, memoize and time the queries and rendering of one rerun"""
+    config = get_config()
+    token = _active_page.set(page_name)
+    try:
+        with query_tag(page_name), \
+                track_queries(page_name, config.query_budgets.get(page_name), config.n_plus_one_threshold), \
+                rerun_read_cache(), \
+                profile_page(page_name, section):
+            yield
+    finally:
+        _active_page.reset(token)
+
+
+def page_fragment(page_name: str, **fragment_kwargs):
+    """st.fragment that sets up page_context() when it reruns on its own"""
+    def decorator(func):
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            if _active_page.get() is not None:
+                # Part of a full page run, context is already set
+                return func(*args, **kwargs)
+            with page_context(page_name, f"fragment: {func.__name__}"):
+                return func(*args, **kwargs)
+        return st.fragment(run, **fragment_kwargs)
+    return decorator
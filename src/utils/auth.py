@@ -1,15 +1,17 @@
 """
 Functions for password hashing and verification
-"""
 
-import bcrypt
+bcrypt is imported on first use to keep it out of the app's cold start.
+"""
 
 
 def hash_password(password: str) -> str:
     """Password hashing"""
+    import bcrypt
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
 
 def verify_password(password: str, hashed: str) -> bool:
     """Password verification"""
+    import bcrypt
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
@@ -4,25 +4,22 @@ Helper functions for date and time handling
 
 from datetime import datetime, timedelta
 from src.constants import TIMEZONE
-from src.game_config import (
-    GAME_DAY, GAME_START_HOUR, GAME_START_MINUTE,
-    SIGNUP_OPEN_DAY, SIGNUP_OPEN_HOUR, SIGNUP_OPEN_MINUTE,
-    DRAW_ALLOWED_DAY, DRAW_ALLOWED_HOUR, DRAW_ALLOWED_MINUTE
-)
+from src.game_config import get_config
 
 
 def get_next_game_time():
     """Gets the date of the next game"""
+    game = get_config().game
     now = datetime.now(TIMEZONE)
-    days_ahead = GAME_DAY - now.weekday()
+    days_ahead = game.day - now.weekday()
     
     # If today is game day but after start time, take next week
-    if days_ahead < 0 or (days_ahead == 0 and (now.hour > GAME_START_HOUR or 
-                                               (now.hour == GAME_START_HOUR and now.minute >= GAME_START_MINUTE))):
+    if days_ahead < 0 or (days_ahead == 0 and (now.hour > game.hour or 
+                                               (now.hour == game.hour and now.minute >= game.minute))):
         days_ahead += 7
     
     next_game = now + timedelta(days=days_ahead)
-    return next_game.replace(hour=GAME_START_HOUR, minute=GAME_START_MINUTE, second=0, microsecond=0)
+    return next_game.replace(hour=game.hour, minute=game.minute, second=0, microsecond=0)
 
 
 def parse_game_time(start_time):
@@ -45,25 +42,27 @@ def parse_timestamp(timestamp):
 
 def get_last_signup_opening():
     """Gets the date of the last signup opening"""
+    signup = get_config().signup
     now = datetime.now(TIMEZONE)
-    days_back = now.weekday() - SIGNUP_OPEN_DAY
+    days_back = now.weekday() - signup.day
     
     # If today is opening day but before the hour, take previous week
     if days_back < 0:
         days_back += 7
-    elif days_back == 0 and now.hour < SIGNUP_OPEN_HOUR:
+    elif days_back == 0 and now.hour < signup.hour:
         days_back = 7
     
     last_opening = now - timedelta(days=days_back)
-    return last_opening.replace(hour=SIGNUP_OPEN_HOUR, minute=SIGNUP_OPEN_MINUTE, second=0, microsecond=0)
+    return last_opening.replace(hour=signup.hour, minute=signup.minute, second=0, microsecond=0)
 
 
 def is_draw_time_allowed():
     """Checks if lineup draw time is allowed"""
+    draw = get_config().draw
     now = datetime.now(TIMEZONE)
-    is_correct_day = now.weekday() == DRAW_ALLOWED_DAY
-    is_correct_time = now.hour >= DRAW_ALLOWED_HOUR or (
-        now.hour == DRAW_ALLOWED_HOUR and now.minute >= DRAW_ALLOWED_MINUTE
+    is_correct_day = now.weekday() == draw.day
+    is_correct_time = now.hour >= draw.hour or (
+        now.hour == draw.hour and now.minute >= draw.minute
     )
     return is_correct_day and is_correct_time
 
@@ -0,0 +1,132 @@
+"""
+Buffered, non-blocking sink for security and application events
+
+Events go into a bounded ring buffer and a background thread writes them
+in batches. The target is chosen with the SECURITY_LOG_SINK variable:
+  - "stdout" (default): one write per batch in the "[SECURITY] ..." format
+  - "file": JSON lines appended to SECURITY_LOG_PATH
+  - "db": one multi-row INSERT into security_events per batch
+"""
+
+import os
+import sys
+import json
+import atexit
+import random
+import threading
+from collections import deque
+from datetime import datetime
+import streamlit as st
+from src.constants import TIMEZONE
+
+DEFAULT_LOG_PATH = "/tmp/security_events.jsonl"
+
+# Fraction of events kept for high-volume event types (others are always kept)
+SAMPLE_RATES = {
+    'rate_limit': 0.1,
+}
+
+
+class EventSink:
+    """Ring buffer of events flushed in batches by a background thread"""
+    
+    def __init__(self, writer, capacity: int = 1000, batch_size: int = 100,
+                 flush_interval: float = 2.0, sample_rates: dict = None):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sample_rates = sample_rates if sample_rates is not None else SAMPLE_RATES
+        self.dropped = 0
+        self._buffer = deque(maxlen=capacity)
+        self._wakeup = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="event-sink", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+    
+    def emit(self, event_type: str, details: str):
+        """Queue an event without blocking the caller"""
+        rate = self.sample_rates.get(event_type, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            return
+        
+        if len(self._buffer) == self._buffer.maxlen:
+            # Oldest event is overwritten
+            self.dropped += 1
+        self._buffer.append({
+            'timestamp': datetime.now(TIMEZONE),
+            'type': event_type,
+            'details': details,
+            'sample_rate': rate,
+        })
+        
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+    
+    def flush(self):
+        """Write all buffered events in batches"""
+        with self._flush_lock:
+            while self._buffer:
+                batch = []
+                while self._buffer and len(batch) < self.batch_size:
+                    batch.append(self._buffer.popleft())
+                try:
+                    self.writer(batch)
+                except Exception as e:
+                    print(f"[SECURITY] Nie udało się zapisać {len(batch)} zdarzeń: {e}", file=sys.stderr)
+    
+    def _run(self):
+        """Background loop: flush every flush_interval or when a batch is full"""
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+def stdout_writer(events: list):
+    """Write a batch to stdout in one call"""
+    sys.stdout.write(''.join(
+        f"[SECURITY] {event['timestamp'].strftime('%Y-%m-%d %H:%M:%S')} - {event['type']}: {event['details']}\n"
+        for event in events
+    ))
+    sys.stdout.flush()
+
+
+def jsonl_writer(path: str):
+    """Writer appending a batch as JSON lines to a local file"""
+    def write(events: list):
+        with open(path, 'a', encoding='utf-8') as file:
+            file.write(''.join(
+                json.dumps({**event, 'timestamp': event['timestamp'].isoformat()}, ensure_ascii=False) + '\n'
+                for event in events
+            ))
+    return write
+
+
+def db_writer(db):
+    """Writer inserting a batch into security_events with one multi-row INSERT"""
+    def write(events: list):
+        db.execute_values(
+            "INSERT INTO security_events (created_at, event_type, details, sample_rate) VALUES %s RETURNING id",
+            [
+                (event['timestamp'], event['type'], event['details'], event['sample_rate'])
+                for event in events
+            ]
+        )
+    return write
+
+
+@st.cache_resource
+def get_event_sink() -> EventSink:
+    """Get the process-wide event sink configured from the environment"""
+    sink_type = os.getenv("SECURITY_LOG_SINK", "stdout")
+    
+    if sink_type == "file":
+        writer = jsonl_writer(os.getenv("SECURITY_LOG_PATH", DEFAULT_LOG_PATH))
+    elif sink_type == "db":
+        from src.database import get_db
+        writer = db_writer(get_db())
+    else:
+        writer = stdout_writer
+    
+    return EventSink(writer)
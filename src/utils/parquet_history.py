@@ -0,0 +1,223 @@
+"""
+Columnar export and import of the game history (Parquet, via pyarrow)
+
+Export streams each table from a server-side cursor in chunks of
+EXPORT_CHUNK_ROWS rows and appends every chunk as a Parquet row group, so
+memory stays bounded by one chunk whatever the history size. Signups are
+exported without password hashes. Import reads the files batch by batch
+and loads them with COPY into a staging table, then inserts rows that do
+not exist yet.
+
+No Streamlit dependency - used by history_io.py and the admin page.
+"""
+
+import os
+import io
+import json
+import logging
+import zipfile
+import tempfile
+from pathlib import Path
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from psycopg2 import sql
+from psycopg2.extras import RealDictCursor
+
+logger = logging.getLogger(__name__)
+
+CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "5000"))
+
+_TIMESTAMP = pa.timestamp('us', tz='UTC')
+
+# file name -> (query, Parquet schema); column names match the query's
+EXPORT_TABLES = {
+    'games': (
+        """
+        SELECT id::text AS id, start_time, active, cost_per_player, max_players
+        FROM games
+        ORDER BY start_time
+        """,
+        pa.schema([
+            ('id', pa.string()),
+            ('start_time', _TIMESTAMP),
+            ('active', pa.bool_()),
+            ('cost_per_player', pa.decimal128(8, 2)),
+            ('max_players', pa.int32()),
+        ]),
+    ),
+    'signups': (
+        """
+        SELECT id::text AS id, game_id::text AS game_id, player_id, nickname, timestamp,
+               COALESCE(paid, FALSE) AS paid
+        FROM signups_all
+        ORDER BY game_id, timestamp
+        """,
+        pa.schema([
+            ('id', pa.string()),
+            ('game_id', pa.string()),
+            ('player_id', pa.int64()),
+            ('nickname', pa.string()),
+            ('timestamp', _TIMESTAMP),
+            ('paid', pa.bool_()),
+        ]),
+    ),
+    'teams': (
+        """
+        SELECT id::text AS id, game_id::text AS game_id, team_color, players,
+               draw_id::text AS draw_id, drawn_at
+        FROM teams_all
+        ORDER BY game_id, team_color
+        """,
+        pa.schema([
+            ('id', pa.string()),
+            ('game_id', pa.string()),
+            ('team_color', pa.string()),
+            ('players', pa.list_(pa.string())),
+            ('draw_id', pa.string()),
+            ('drawn_at', _TIMESTAMP),
+        ]),
+    ),
+    # Derived from signups.paid and games.cost_per_player - exported for reporting only
+    'payments': (
+        """
+        SELECT p.nickname, b.unpaid_games, b.amount_due
+        FROM player_balances b
+        JOIN players p ON p.id = b.player_id
+        ORDER BY p.nickname
+        """,
+        pa.schema([
+            ('nickname', pa.string()),
+            ('unpaid_games', pa.int32()),
+            ('amount_due', pa.decimal128(10, 2)),
+        ]),
+    ),
+}
+
+# Import order (foreign keys) -> (table, columns loaded from the file, extra constant columns,
+# relation checked for existing ids - includes the archive tables)
+IMPORT_TABLES = {
+    'games': ('games', ['id', 'start_time', 'active', 'cost_per_player', 'max_players'], {}, 'games'),
+    # player_id is filled from the nickname by the signups_player_id trigger;
+    # restored signups get no password (they belong to closed games)
+    'signups': ('signups', ['id', 'game_id', 'nickname', 'timestamp', 'paid'], {'password_hash': ''}, 'signups_all'),
+    'teams': ('teams', ['id', 'game_id', 'team_color', 'players', 'draw_id', 'drawn_at'], {}, 'teams_all'),
+}
+
+
+def cursor_chunks(connection, query: str, params=None, chunk_rows: int = CHUNK_ROWS):
+    """Rows of a query in lists of up to chunk_rows dicts, read through a server-side cursor"""
+    with connection.cursor(name="history_export", cursor_factory=RealDictCursor) as cur:
+        cur.itersize = chunk_rows
+        cur.execute(query, params)
+        while True:
+            rows = cur.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield rows
+
+
+def export_table(chunks, schema: pa.Schema, path: Path) -> int:
+    """Write row chunks to one Parquet file, a row group per chunk; returns the row count"""
+    count = 0
+    with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+        for rows in chunks:
+            writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=schema))
+            count += len(rows)
+    return count
+
+
+def export_history(stream, out_dir: Path, tables=None, chunk_rows: int = CHUNK_ROWS) -> dict:
+    """Export tables to <out_dir>/<table>.parquet
+
+    `stream(query, chunk_rows)` yields lists of row dicts, e.g.
+    lambda query, chunk_rows: cursor_chunks(connection, query, chunk_rows=chunk_rows).
+    Returns {table: row count}.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    counts = {}
+    for table in tables or EXPORT_TABLES:
+        query, schema = EXPORT_TABLES[table]
+        counts[table] = export_table(stream(query, chunk_rows), schema, out_dir / f"{table}.parquet")
+        logger.info(f"📦 {table}: {counts[table]} wierszy")
+    return counts
+
+
+def export_archive(stream, zip_path: Path, chunk_rows: int = CHUNK_ROWS) -> dict:
+    """Write a zip with one Parquet file per table to zip_path (on disk, not in memory); returns counts"""
+    with tempfile.TemporaryDirectory() as tmp:
+        counts = export_history(stream, Path(tmp), chunk_rows=chunk_rows)
+        # Parquet is already compressed
+        with zipfile.ZipFile(zip_path, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for table in counts:
+                archive.write(Path(tmp) / f"{table}.parquet", f"{table}.parquet")
+        return counts
+
+
+def _csv_batch(batch: pa.RecordBatch, columns: list) -> bytes:
+    """CSV (COPY-compatible) of the given columns; list columns become JSON arrays"""
+    arrays = []
+    for name in columns:
+        column = batch.column(name)
+        if pa.types.is_list(column.type):
+            column = pa.array([None if value is None else json.dumps(value) for value in column.to_pylist()],
+                              type=pa.string())
+        arrays.append(column)
+    buffer = io.BytesIO()
+    pa_csv.write_csv(pa.RecordBatch.from_arrays(arrays, names=columns), buffer)
+    return buffer.getvalue()
+
+
+def import_table(cur, path: Path, table: str, columns: list, constants: dict, existing: str,
+                 chunk_rows: int = CHUNK_ROWS) -> int:
+    """COPY one Parquet file into a staging table and insert the new rows; returns inserted count"""
+    stage = sql.Identifier(f"import_{table}")
+    column_list = sql.SQL(', ').join(map(sql.Identifier, columns))
+    cur.execute(sql.SQL("CREATE TEMP TABLE {} ON COMMIT DROP AS SELECT {} FROM {} WITH NO DATA").format(
+        stage, column_list, sql.Identifier(table)
+    ))
+
+    copy = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, HEADER true)").format(stage, column_list)
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+        cur.copy_expert(copy.as_string(cur), io.BytesIO(_csv_batch(batch, columns)))
+
+    target_columns = sql.SQL(', ').join(map(sql.Identifier, columns + list(constants)))
+    values = sql.SQL(', ').join(
+        [sql.Identifier(column) for column in columns] + [sql.Literal(value) for value in constants.values()]
+    )
+    cur.execute(sql.SQL("""
+        INSERT INTO {table} ({target_columns})
+        SELECT {values} FROM {stage}
+        WHERE NOT EXISTS (SELECT 1 FROM {existing} e WHERE e.id = {stage}.id)
+        ON CONFLICT DO NOTHING
+    """).format(
+        table=sql.Identifier(table), target_columns=target_columns, values=values,
+        stage=stage, existing=sql.Identifier(existing)
+    ))
+    return cur.rowcount
+
+
+def import_history(connection, in_dir: Path, default_capacity=None, chunk_rows: int = CHUNK_ROWS) -> dict:
+    """Load <in_dir>/<table>.parquet files in one transaction; existing rows are kept
+
+    Returns {table: inserted row count}. Player statistics are rebuilt when
+    games were added, since their order matters for streaks.
+    """
+    in_dir = Path(in_dir)
+    counts = {}
+    try:
+        with connection.cursor() as cur:
+            for name, (table, columns, constants, existing) in IMPORT_TABLES.items():
+                path = in_dir / f"{name}.parquet"
+                if not path.exists():
+                    continue
+                counts[name] = import_table(cur, path, table, columns, constants, existing, chunk_rows)
+                logger.info(f"📥 {name}: dodano {counts[name]} wierszy")
+            if counts.get('games') or counts.get('signups') or counts.get('teams'):
+                cur.execute("SELECT rebuild_player_stats(%s)", (default_capacity,))
+        connection.commit()
+        return counts
+    except Exception:
+        connection.rollback()
+        raise
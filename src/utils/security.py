@@ -3,13 +3,97 @@ Rate limiting and additional security measures
 """
 
 import streamlit as st
+import threading
 import time
-from datetime import datetime, timedelta
-from src.constants import TIMEZONE
+import uuid
+from collections import OrderedDict
+from src.utils.event_log import get_event_sink
+
+
+class TokenBucketLimiter:
+    """In-process token-bucket limiter shared by all sessions
+
+    Each (client, action) key holds only (tokens, last_refill), so a check
+    is O(1). Idle keys are evicted in LRU order once max_keys is reached.
+    """
+    
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _refill(self, key: tuple, capacity: int, rate: float, now: float) -> float:
+        """Return current tokens for key (refilled since last use) and mark it recently used"""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = float(capacity)
+        else:
+            tokens = min(float(capacity), bucket[0] + (now - bucket[1]) * rate)
+            self._buckets.move_to_end(key)
+        return tokens
+    
+    def _store(self, key: tuple, tokens: float, now: float):
+        """Save bucket state, evicting least recently used keys if needed"""
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+    
+    def allow(self, key: tuple, capacity: int, rate: float) -> bool:
+        """Take one token for key; False if the bucket is empty"""
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._refill(key, capacity, rate, now)
+            if tokens < 1:
+                self._store(key, tokens, now)
+                return False
+            self._store(key, tokens - 1, now)
+            return True
+    
+    def retry_after(self, key: tuple, capacity: int, rate: float) -> int:
+        """Seconds until key gets its next token"""
+        now = time.monotonic()
+        with self._lock:
+            if key not in self._buckets:
+                return 0
+            tokens = self._refill(key, capacity, rate, now)
+        if tokens >= 1:
+            return 0
+        return int((1 - tokens) / rate) + 1
+
+
+@st.cache_resource
+def get_rate_limiter() -> TokenBucketLimiter:
+    """Get the process-wide rate limiter"""
+    return TokenBucketLimiter()
+
+
+def get_client_id() -> str:
+    """Identify the client: proxy-seen IP, then socket IP, then a per-session id
+
+    Only the last X-Forwarded-For entry is used - it is appended by our own
+    proxy, while earlier entries come from the client and can be forged.
+    """
+    context = getattr(st, 'context', None)
+    if context is not None:
+        try:
+            forwarded = context.headers.get('X-Forwarded-For')
+            if forwarded:
+                last_hop = forwarded.split(',')[-1].strip()
+                if last_hop:
+                    return last_hop
+        except Exception:
+            pass
+        ip_address = getattr(context, 'ip_address', None)
+        if ip_address:
+            return ip_address
+    
+    if 'client_id' not in st.session_state:
+        st.session_state['client_id'] = str(uuid.uuid4())
+    return st.session_state['client_id']
 
 
 class RateLimiter:
-    """Simple rate limiter using session state"""
+    """Rate limiter backed by the shared token-bucket limiter"""
     
     @staticmethod
     def check_signup_rate_limit(key: str = "signup_attempts", max_attempts: int = 3, window_minutes: int = 5) -> bool:
@@ -17,46 +101,21 @@ class RateLimiter:
         Check if user hasn't exceeded signup limit
         
         Args:
-            key: key in session_state
-            max_attempts: maximum number of attempts
-            window_minutes: time window in minutes
+            key: action name (limits are kept per client and action)
+            max_attempts: bucket capacity (burst size)
+            window_minutes: time for an empty bucket to refill completely
             
         Returns:
             True if can continue, False if limit exceeded
         """
-        now = datetime.now()
-        
-        if key not in st.session_state:
-            st.session_state[key] = []
-        
-        # Remove old attempts (before window_minutes)
-        cutoff = now - timedelta(minutes=window_minutes)
-        st.session_state[key] = [
-            attempt for attempt in st.session_state[key] 
-            if attempt > cutoff
-        ]
-        
-        # Check if can add new attempt
-        if len(st.session_state[key]) >= max_attempts:
-            return False
-        
-        # Add new attempt
-        st.session_state[key].append(now)
-        return True
+        rate = max_attempts / (window_minutes * 60)
+        return get_rate_limiter().allow((get_client_id(), key), max_attempts, rate)
     
     @staticmethod
-    def get_remaining_cooldown(key: str = "signup_attempts", window_minutes: int = 5) -> int:
+    def get_remaining_cooldown(key: str = "signup_attempts", window_minutes: int = 5, max_attempts: int = 3) -> int:
         """Return remaining cooldown time in seconds"""
-        if key not in st.session_state or not st.session_state[key]:
-            return 0
-        
-        oldest_attempt = min(st.session_state[key])
-        cooldown_end = oldest_attempt + timedelta(minutes=window_minutes)
-        now = datetime.now()
-        
-        if cooldown_end > now:
-            return int((cooldown_end - now).total_seconds())
-        return 0
+        rate = max_attempts / (window_minutes * 60)
+        return get_rate_limiter().retry_after((get_client_id(), key), max_attempts, rate)
 
 
 def validate_nickname(nickname: str) -> tuple[bool, str]:
@@ -135,25 +194,11 @@ def log_security_event(event_type: str, details: str):
     """
     Log security-related events
     
+    Events are queued in the process-wide buffered sink (src/utils/event_log.py),
+    so logging never blocks the signup path.
+    
     Args:
         event_type: event type (rate_limit, invalid_input, etc.)
         details: event details
     """
-    timestamp = datetime.now(TIMEZONE).strftime('%Y-%m-%d %H:%M:%S')
-    
-    # In production app, it's worth logging to external service
-    print(f"[SECURITY] {timestamp} - {event_type}: {details}")
-    
-    # Optionally add to session_state for debugging
-    if 'security_log' not in st.session_state:
-        st.session_state['security_log'] = []
-    
-    st.session_state['security_log'].append({
-        'timestamp': timestamp,
-        'type': event_type,
-        'details': details
-    })
-    
-    # Limit log size
-    if len(st.session_state['security_log']) > 50:
-        st.session_state['security_log'] = st.session_state['security_log'][-50:]
+    get_event_sink().emit(event_type, details)
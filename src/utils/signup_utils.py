@@ -8,21 +8,95 @@ from datetime import datetime
 from src.database import SupabaseDB
 from src.constants import TIMEZONE
 from src.utils.auth import hash_password, verify_password
+from src.utils.datetime_utils import parse_timestamp
 from src.utils.security import sanitize_input, log_security_event
+from src.utils.snapshots import refresh_game_snapshot
+from src.game_config import get_config
 
+# Signups of one game by the player with this nickname (case/whitespace-insensitive,
+# via the players registry - migrations/007_players.sql). Params: (game_id, nickname)
+PLAYER_SIGNUP_QUERY = """
+    SELECT * FROM signups
+    WHERE game_id = %s
+      AND player_id = (SELECT id FROM players WHERE normalize_nickname(nickname) = normalize_nickname(%s))
+"""
+
+# Signups of one game with their list position and reserve flag, read from {table}.
+# Params: see _ranked_params()
+_RANKED_SIGNUPS_TEMPLATE = """
+    SELECT s.*,
+           ROW_NUMBER() OVER w AS position,
+           COALESCE(g.max_players, %s) AS capacity,
+           COALESCE(ROW_NUMBER() OVER w > COALESCE(g.max_players, %s), FALSE) AS reserve
+    FROM {table} s
+    JOIN games g ON g.id = s.game_id
+    WHERE s.game_id = %s
+    WINDOW w AS (ORDER BY s.timestamp, s.id)
+"""
+
+RANKED_SIGNUPS_QUERY = _RANKED_SIGNUPS_TEMPLATE.format(table="signups")
+
+# Same over hot and archived signups (migrations/009_archive.sql) - for past games
+RANKED_SIGNUPS_ALL_QUERY = _RANKED_SIGNUPS_TEMPLATE.format(table="signups_all")
+
+
+def _ranked_params(game_id: str) -> tuple:
+    """(default capacity, default capacity, game_id)"""
+    default_max_players = get_config().default_max_players
+    return (default_max_players, default_max_players, game_id)
 
-def get_signups_for_game(db: SupabaseDB, game_id: str):
-    """Gets signups for a given game"""
+
+def fetch_ranked_signups(db: SupabaseDB, game_id: str, include_archive: bool = False):
+    """Ordered signups of a game, like get_signups_for_game(), but database errors are raised"""
+    query = RANKED_SIGNUPS_ALL_QUERY if include_archive else RANKED_SIGNUPS_QUERY
+    return db.execute_query(f"{query} ORDER BY position", _ranked_params(game_id))
+
+
+def get_signups_for_game(db: SupabaseDB, game_id: str, include_archive: bool = False):
+    """Gets signups for a given game, in order, with `position`, `capacity` and `reserve`
+    
+    include_archive also looks in the archive tables (needed for old closed games).
+    """
     try:
-        return db.execute_query(
-            "SELECT * FROM signups WHERE game_id = %s ORDER BY timestamp",
-            (game_id,)
-        )
+        return fetch_ranked_signups(db, game_id, include_archive)
     except Exception as e:
         st.error(f"Błąd podczas pobierania zapisów: {e}")
         return []
 
 
+def split_reserves(signups: list):
+    """(main squad, reserve list) of signups from get_signups_for_game()"""
+    main_squad = [signup for signup in signups if not signup.get('reserve')]
+    reserves = [signup for signup in signups if signup.get('reserve')]
+    return main_squad, reserves
+
+
+def get_signups_version(db: SupabaseDB, game_id: str):
+    """Gets the change counter of a game's signup list (bumped by a trigger on signups)"""
+    try:
+        result = db.execute_query(
+            "SELECT signups_version FROM games WHERE id = %s",
+            (game_id,)
+        )
+        return result[0]['signups_version'] if result else None
+    except Exception as e:
+        st.error(f"Błąd podczas sprawdzania zmian listy: {e}")
+        return None
+
+
+def signups_to_dataframe(signups: list):
+    """Builds the signup table (pandas DataFrame) shown on the list and history pages"""
+    import pandas as pd  # Imported on first use, not at app start
+    return pd.DataFrame([
+        {
+            "Lp.": signup.get('position', i+1),
+            "Nickname": signup['nickname'],
+            "Czas zapisu": parse_timestamp(signup['timestamp']).strftime('%d.%m.%Y %H:%M:%S')
+        }
+        for i, signup in enumerate(signups)
+    ])
+
+
 def add_signup(db: SupabaseDB, game_id: str, nickname: str, password: str):
     """Adds player signup"""
     try:
@@ -32,19 +106,40 @@ def add_signup(db: SupabaseDB, game_id: str, nickname: str, password: str):
         
         # Check if nickname already exists in this game
         existing = db.execute_query(
-            "SELECT * FROM signups WHERE game_id = %s AND nickname = %s",
+            PLAYER_SIGNUP_QUERY,
             (game_id, nickname)
         )
         if existing:
             log_security_event("duplicate_signup_attempt", f"nickname: {nickname}, game: {game_id[:8]}...")
             return False, "Ten nickname jest już zajęty w tej gierce!"
         
-        # Add signup
+        # Add signup and read back its place on the list. A concurrent signup with the same
+        # nickname may have passed the check above - the unique (game_id, player_id) index
+        # (migrations/010_signups_player_unique.sql) turns this insert into a no-op then
         signup_id = str(uuid.uuid4())
-        db.execute_query(
-            "INSERT INTO signups (id, game_id, nickname, password_hash, timestamp) VALUES (%s, %s, %s, %s, %s)",
-            (signup_id, game_id, nickname, hash_password(password), datetime.now(TIMEZONE).isoformat())
-        )
+        # bcrypt is slow - hash before taking a connection, not while holding one
+        password_hash = hash_password(password)
+        with db.transaction() as cur:
+            cur.execute(
+                """
+                INSERT INTO signups (id, game_id, nickname, password_hash, timestamp) VALUES (%s, %s, %s, %s, %s)
+                ON CONFLICT (game_id, player_id) DO NOTHING
+                """,
+                (signup_id, game_id, nickname, password_hash, datetime.now(TIMEZONE).isoformat())
+            )
+            inserted = cur.rowcount == 1
+            if inserted:
+                cur.execute(
+                    f"SELECT position, reserve FROM ({RANKED_SIGNUPS_QUERY}) ranked WHERE id = %s",
+                    _ranked_params(game_id) + (signup_id,)
+                )
+                ranked = cur.fetchone()
+        if not inserted:
+            log_security_event("duplicate_signup_attempt", f"nickname: {nickname}, game: {game_id[:8]}...")
+            return False, "Ten nickname jest już zajęty w tej gierce!"
+        refresh_game_snapshot(db.execute_query, game_id)
+        if ranked and ranked['reserve']:
+            return True, f"Zapisano na listę rezerwową (miejsce {ranked['position']} na liście)."
         return True, "Zapisano pomyślnie!"
     except Exception as e:
         error_msg = str(e)
@@ -63,7 +158,7 @@ def remove_signup(db: SupabaseDB, game_id: str, nickname: str, password: str):
         
         # Find signup
         signups = db.execute_query(
-            "SELECT * FROM signups WHERE game_id = %s AND nickname = %s",
+            PLAYER_SIGNUP_QUERY,
             (game_id, nickname)
         )
         if not signups:
@@ -74,8 +169,27 @@ def remove_signup(db: SupabaseDB, game_id: str, nickname: str, password: str):
             log_security_event("invalid_password_attempt", f"nickname: {nickname}, game: {game_id[:8]}...")
             return False, "Nieprawidłowe hasło!"
         
-        # Remove signup
-        db.execute_query("DELETE FROM signups WHERE id = %s", (signup['id'],))
+        # Remove signup; the first reserve (if any) moves into the freed place
+        promoted = None
+        with db.transaction() as cur:
+            # Serializes with other signups of this game (the signups_version trigger updates this row)
+            cur.execute("SELECT id FROM games WHERE id = %s FOR UPDATE", (game_id,))
+            cur.execute(
+                f"SELECT position, capacity, reserve FROM ({RANKED_SIGNUPS_QUERY}) ranked WHERE id = %s",
+                _ranked_params(game_id) + (signup['id'],)
+            )
+            removed = cur.fetchone()
+            cur.execute("DELETE FROM signups WHERE id = %s", (signup['id'],))
+            if removed and removed['capacity'] and not removed['reserve']:
+                cur.execute(
+                    f"SELECT nickname FROM ({RANKED_SIGNUPS_QUERY}) ranked WHERE position = %s",
+                    _ranked_params(game_id) + (removed['capacity'],)
+                )
+                row = cur.fetchone()
+                promoted = row['nickname'] if row else None
+        refresh_game_snapshot(db.execute_query, game_id)
+        if promoted:
+            return True, f"Wypisano pomyślnie! Z listy rezerwowej do składu wchodzi: {promoted}"
         return True, "Wypisano pomyślnie!"
     except Exception as e:
         error_msg = str(e)
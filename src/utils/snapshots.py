@@ -0,0 +1,343 @@
+"""
+Static snapshots of active games' signup lists and lineups
+
+Write paths (signup, signout, draw) queue a regeneration of
+<SNAPSHOT_DIR>/<game_id>.json and .html; a background thread in the app
+process writes them after a short debounce, off the request path. Every
+SNAPSHOT_CHECK_SECONDS it also rewrites games whose signups version or
+effective capacity changed elsewhere, and every SNAPSHOT_REFRESH_SECONDS
+it rewrites index.json/index.html with the active games and drops closed
+ones. The scheduler does the same only
+when SNAPSHOT_DIR is set for it, i.e. when it runs on the host serving
+that directory. Files are replaced atomically and can be served by any
+static file server, with no database access or Python per request. When
+SNAPSHOT_URL (the public URL of that directory) is set, the list page
+links to them.
+
+This module has no Streamlit dependency so the scheduler can use it:
+`query` is any callable (sql, params) -> list of dicts.
+"""
+
+import os
+import json
+import html
+import time
+import logging
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from src.constants import TIMEZONE
+from src.game_config import get_config
+
+try:
+    import fcntl
+except ImportError:  # Windows - only the in-process lock below
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_DIR = Path(__file__).parent.parent.parent / "static" / "snapshots"
+
+# Seconds to collect a burst of writes before regenerating, between checks for
+# changed games (signups version or capacity) and between full refreshes
+DEBOUNCE_SECONDS = float(os.getenv("SNAPSHOT_DEBOUNCE_SECONDS", "1"))
+CHECK_SECONDS = float(os.getenv("SNAPSHOT_CHECK_SECONDS", "30"))
+FULL_REFRESH_SECONDS = float(os.getenv("SNAPSHOT_REFRESH_SECONDS", "300"))
+
+_write_lock = threading.Lock()
+
+
+def get_snapshot_dir() -> Path:
+    """Directory for snapshots (SNAPSHOT_DIR or static/snapshots)"""
+    return Path(os.getenv("SNAPSHOT_DIR", DEFAULT_SNAPSHOT_DIR))
+
+
+def get_snapshot_url(game_id: str):
+    """Public URL of a game's HTML snapshot (None unless SNAPSHOT_URL is set)"""
+    base_url = os.getenv("SNAPSHOT_URL")
+    if not base_url:
+        return None
+    return f"{base_url.rstrip('/')}/{game_id}.html"
+
+
+def _format_time(value) -> str:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return value.astimezone(TIMEZONE).strftime('%d.%m.%Y %H:%M')
+
+
+def write_atomic(path: Path, content: str):
+    """Write a file so readers see either the old or the new version"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            file.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def build_game_snapshot(query, game_id: str):
+    """Ordered list, count and lineups of one game (None if the game does not exist)"""
+    games = query("SELECT id, start_time, signups_version, max_players FROM games WHERE id = %s", (game_id,))
+    if not games:
+        return None
+    game = games[0]
+    game_id = str(game['id'])
+    capacity = game['max_players'] or get_config().default_max_players
+    signups = query(
+        "SELECT nickname, timestamp FROM signups WHERE game_id = %s ORDER BY timestamp, id",
+        (game_id,)
+    )
+    teams = query(
+        "SELECT team_color, players FROM teams WHERE game_id = %s ORDER BY team_color",
+        (game_id,)
+    )
+    return {
+        'game_id': game_id,
+        'start_time': _format_time(game['start_time']),
+        'version': game['signups_version'],
+        'generated_at': datetime.now(TIMEZONE).isoformat(timespec='seconds'),
+        'count': len(signups),
+        'capacity': capacity,
+        'signups': [
+            {'position': i + 1, 'nickname': signup['nickname'], 'timestamp': signup['timestamp'].isoformat()
+             if isinstance(signup['timestamp'], datetime) else str(signup['timestamp']),
+             'reserve': bool(capacity) and i + 1 > capacity}
+            for i, signup in enumerate(signups)
+        ],
+        'teams': {team['team_color']: team['players'] for team in teams},
+    }
+
+
+def render_game_html(snapshot: dict) -> str:
+    """Standalone HTML page of a game snapshot (reloads itself every 30 s)"""
+    rows = "\n".join(
+        ('<tr class="reserve">' if signup.get('reserve') else "<tr>")
+        + f"<td>{signup['position']}</td><td>{html.escape(signup['nickname'])}</td>"
+        f"<td>{html.escape(_format_time(signup['timestamp']).split(' ')[1])}</td></tr>"
+        for signup in snapshot['signups']
+    )
+    teams = "\n".join(
+        f"<div class=\"team\"><h3>{html.escape(color.upper())}</h3><ol>"
+        + "".join(f"<li>{html.escape(player)}</li>" for player in players)
+        + "</ol></div>"
+        for color, players in snapshot['teams'].items()
+    )
+    return f"""<!DOCTYPE html>
+<html lang="pl">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<meta http-equiv="refresh" content="30">
+<title>Parkowa - gierka {html.escape(snapshot['start_time'])}</title>
+<style>
+body {{ font-family: sans-serif; max-width: 40em; margin: 1em auto; padding: 0 1em; }}
+table {{ border-collapse: collapse; width: 100%; }}
+td, th {{ border-bottom: 1px solid #ddd; padding: .3em; text-align: left; }}
+.team {{ display: inline-block; vertical-align: top; margin-right: 2em; }}
+small, .reserve {{ color: #777; }}
+</style>
+</head>
+<body>
+<h1>⚽ Gierka {html.escape(snapshot['start_time'])}</h1>
+<p><b>Łącznie zapisanych: {snapshot['count']}</b>{f" (skład: {snapshot['capacity']}, dalej rezerwa)" if snapshot.get('capacity') else ""}</p>
+<table>
+<tr><th>Lp.</th><th>Nickname</th><th>Godzina zapisu</th></tr>
+{rows}
+</table>
+{"<h2>Składy</h2>" + teams if teams else ""}
+<p><small>Stan z {html.escape(snapshot['generated_at'])}</small></p>
+</body>
+</html>
+"""
+
+
+class _DirectoryLock:
+    """Exclusive lock on a snapshot directory, across threads and processes"""
+    
+    def __init__(self, snapshot_dir: Path):
+        self.path = snapshot_dir / ".lock"
+        self._file = None
+    
+    def __enter__(self):
+        _write_lock.acquire()
+        if fcntl is not None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, 'a')
+                fcntl.flock(self._file, fcntl.LOCK_EX)
+            except Exception:
+                self.__exit__(None, None, None)
+                raise
+        return self
+    
+    def __exit__(self, *exc):
+        if self._file is not None:
+            self._file.close()  # releases the flock
+            self._file = None
+        _write_lock.release()
+
+
+def _read_snapshot(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def _existing_version(path: Path):
+    return _read_snapshot(path).get('version')
+
+
+def write_game_snapshot(query, game_id: str, snapshot_dir: Path = None):
+    """Regenerate the JSON and HTML snapshot of one game"""
+    snapshot_dir = snapshot_dir or get_snapshot_dir()
+    snapshot = build_game_snapshot(query, str(game_id))
+    if snapshot is None:
+        return None
+    json_path = snapshot_dir / f"{snapshot['game_id']}.json"
+    page = render_game_html(snapshot)
+    
+    # Compare and replace under the directory lock, so a slower concurrent
+    # writer cannot replace a newer list with an older one
+    with _DirectoryLock(snapshot_dir):
+        existing = _existing_version(json_path)
+        if existing is not None and snapshot['version'] is not None and existing > snapshot['version']:
+            return snapshot
+        write_atomic(snapshot_dir / f"{snapshot['game_id']}.html", page)
+        write_atomic(json_path, json.dumps(snapshot, ensure_ascii=False, indent=1))
+    return snapshot
+
+
+def refresh_snapshots(query, snapshot_dir: Path = None) -> int:
+    """Regenerate snapshots of all active games and the index; drop inactive ones"""
+    snapshot_dir = snapshot_dir or get_snapshot_dir()
+    games = query("SELECT id, start_time FROM games WHERE active = TRUE ORDER BY start_time")
+    
+    index = []
+    for game in games:
+        snapshot = write_game_snapshot(query, game['id'], snapshot_dir)
+        if snapshot is None:
+            continue
+        index.append({
+            'game_id': snapshot['game_id'],
+            'start_time': snapshot['start_time'],
+            'count': snapshot['count'],
+        })
+    
+    write_atomic(snapshot_dir / "index.json", json.dumps(index, ensure_ascii=False, indent=1))
+    links = "\n".join(
+        f"<li><a href=\"{entry['game_id']}.html\">{html.escape(entry['start_time'])}</a> "
+        f"({entry['count']} os.)</li>"
+        for entry in index
+    )
+    write_atomic(snapshot_dir / "index.html", (
+        "<!DOCTYPE html>\n<html lang=\"pl\"><head><meta charset=\"utf-8\">"
+        "<title>Parkowa - aktywne gierki</title></head>\n"
+        f"<body><h1>⚽ Aktywne gierki</h1><ul>\n{links}\n</ul></body></html>\n"
+    ))
+    
+    active_ids = {entry['game_id'] for entry in index}
+    with _DirectoryLock(snapshot_dir):
+        for path in list(snapshot_dir.glob("*.json")) + list(snapshot_dir.glob("*.html")):
+            if path.stem != "index" and path.stem not in active_ids:
+                path.unlink(missing_ok=True)
+    
+    return len(index)
+
+
+def refresh_changed_snapshots(query, snapshot_dir: Path = None) -> int:
+    """Regenerate snapshots of active games whose signups version or effective capacity
+    differs from the written file (capacity.default_max_players changes bump no version)"""
+    snapshot_dir = snapshot_dir or get_snapshot_dir()
+    default_capacity = get_config().default_max_players
+    games = query("SELECT id, signups_version, max_players FROM games WHERE active = TRUE")
+    
+    count = 0
+    for game in games:
+        existing = _read_snapshot(snapshot_dir / f"{game['id']}.json")
+        current = (game['signups_version'], game['max_players'] or default_capacity)
+        if (existing.get('version'), existing.get('capacity')) != current:
+            write_game_snapshot(query, game['id'], snapshot_dir)
+            count += 1
+    return count
+
+
+class SnapshotRefresher:
+    """Background thread regenerating snapshots off the request path
+
+    schedule() only records the game id; the thread waits debounce_seconds
+    so a burst of signups costs one regeneration, then writes the pending
+    games. Without writes it regenerates games whose version or capacity
+    changed every check_seconds, and refreshes everything (index, cleanup
+    of closed games) every full_refresh_seconds. Failures are only logged.
+    """
+    
+    def __init__(self, query, snapshot_dir: Path = None,
+                 debounce_seconds: float = DEBOUNCE_SECONDS, check_seconds: float = CHECK_SECONDS,
+                 full_refresh_seconds: float = FULL_REFRESH_SECONDS):
+        self.query = query
+        self.snapshot_dir = snapshot_dir
+        self.debounce_seconds = debounce_seconds
+        self.check_seconds = min(check_seconds, full_refresh_seconds)
+        self.full_refresh_seconds = full_refresh_seconds
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="snapshot-refresher", daemon=True)
+    
+    def start(self):
+        self._thread.start()
+        return self
+    
+    def schedule(self, game_id):
+        with self._lock:
+            self._pending.add(str(game_id))
+        self._wake.set()
+    
+    def _run(self):
+        woken = False
+        last_check = last_full = None  # full refresh on start
+        while True:
+            if woken:
+                time.sleep(self.debounce_seconds)
+            self._wake.clear()
+            with self._lock:
+                pending, self._pending = self._pending, set()
+            now = time.monotonic()
+            try:
+                for game_id in pending:
+                    write_game_snapshot(self.query, game_id, self.snapshot_dir)
+                if last_full is None or now - last_full >= self.full_refresh_seconds:
+                    last_check = last_full = now
+                    refresh_snapshots(self.query, self.snapshot_dir)
+                elif now - last_check >= self.check_seconds:
+                    last_check = now
+                    refresh_changed_snapshots(self.query, self.snapshot_dir)
+            except Exception as e:
+                logger.warning(f"Nie udało się odświeżyć snapshotów: {e}")
+            woken = self._wake.wait(timeout=self.check_seconds)
+
+
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+def start_snapshot_refresher(query) -> SnapshotRefresher:
+    """The process-wide refresher, started on first call"""
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = SnapshotRefresher(query).start()
+        return _refresher
+
+
+def refresh_game_snapshot(query, game_id: str):
+    """Queue a regeneration of one game's snapshot after a write (done in the background)"""
+    start_snapshot_refresher(query).schedule(game_id)
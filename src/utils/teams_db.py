@@ -4,98 +4,66 @@ Functions for handling teams in the database
 
 import streamlit as st
 import uuid
-import json
-import ast
+from psycopg2.extras import Json, execute_values
 from src.database import SupabaseDB
+from src.utils.snapshots import refresh_game_snapshot
 
 
 def save_teams(db: SupabaseDB, game_id: str, teams: dict):
-    """Saves team lineups to database"""
+    """Saves team lineups to database
+
+    The whole lineup is written in one transaction holding a per-game
+    advisory lock, so concurrent redraws end with exactly one lineup.
+    Returns the draw id of the saved lineup, or None on error.
+    """
     try:
-        # Remove previous lineups for this game
-        db.execute_query("DELETE FROM teams WHERE game_id = %s", (game_id,))
+        draw_id = str(uuid.uuid4())
+        rows = [
+            (str(uuid.uuid4()), game_id, color, Json(players), draw_id)  # Stored as jsonb array
+            for color, players in teams.items()
+        ]
+
+        with db.transaction() as cur:
+            # Serialize redraws of the same game until commit
+            cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"teams:{game_id}",))
+
+            execute_values(
+                cur,
+                """
+                INSERT INTO teams (id, game_id, team_color, players, draw_id)
+                VALUES %s
+                ON CONFLICT (game_id, team_color) DO UPDATE
+                SET players = EXCLUDED.players, draw_id = EXCLUDED.draw_id, drawn_at = now()
+                """,
+                rows
+            )
 
-        # Add new lineups
-        for color, players in teams.items():
-            team_id = str(uuid.uuid4())
-            db.execute_query(
-                "INSERT INTO teams (id, game_id, team_color, players) VALUES (%s, %s, %s, %s)",
-                (
-                    team_id,
-                    game_id,
-                    color,
-                    json.dumps(players),
-                ),  # Store players as JSON string
+            # Remove teams left over from a previous draw with other colors
+            cur.execute(
+                "DELETE FROM teams WHERE game_id = %s AND draw_id IS DISTINCT FROM %s",
+                (game_id, draw_id)
             )
-        return True
+        refresh_game_snapshot(db.execute_query, game_id)
+        return draw_id
     except Exception as e:
         st.error(f"Błąd podczas zapisywania składów: {e}")
-        return False
+        return None
 
 
-def get_teams_for_game(db: SupabaseDB, game_id: str):
-    """Gets team lineups for a given game"""
+def get_teams_for_game(db: SupabaseDB, game_id: str, include_archive: bool = False):
+    """Gets team lineups for a given game
+
+    `players` is a jsonb array (see migrations/001_teams_players_jsonb.py),
+    so the driver already returns it as a list of nicknames.
+    include_archive also looks in teams_archive (migrations/009_archive.sql).
+    """
     try:
+        table = "teams_all" if include_archive else "teams"
         teams_data = db.execute_query(
-            "SELECT * FROM teams WHERE game_id = %s", (game_id,)
+            f"SELECT id, game_id, team_color, players, draw_id FROM {table} WHERE game_id = %s",
+            (game_id,)
         )
-        if not teams_data:
-            return []
-
-        def normalize_players(players_value):
-            """Normalizes various DB formats into a list of player nicknames."""
-            if players_value is None:
-                return []
-
-            if isinstance(players_value, list):
-                return [str(player) for player in players_value if player is not None]
-
-            if isinstance(players_value, tuple):
-                return [str(player) for player in players_value if player is not None]
-
-            if isinstance(players_value, str):
-                players_str = players_value.strip()
-                if not players_str:
-                    return []
-
-                # Preferred format: JSON array string.
-                try:
-                    parsed = json.loads(players_str)
-                    if isinstance(parsed, list):
-                        return [str(player) for player in parsed if player is not None]
-                    if isinstance(parsed, str):
-                        return [parsed] if parsed else []
-                except json.JSONDecodeError:
-                    pass
-
-                # Legacy format: Python-like list string "['name1', 'name2']".
-                if players_str.startswith("[") and players_str.endswith("]"):
-                    try:
-                        parsed = ast.literal_eval(players_str)
-                        if isinstance(parsed, list):
-                            return [
-                                str(player) for player in parsed if player is not None
-                            ]
-                        return [str(parsed)] if parsed is not None else []
-                    except Exception:
-                        return [
-                            p.strip(" '\"[]")
-                            for p in players_str.split(",")
-                            if p.strip(" '\"[]")
-                        ]
-
-                # Single nickname saved as plain text.
-                return [players_str]
-
-            # Fallback for unexpected types.
-            return [str(players_value)]
-
-        # Parse players data back to Python lists (supports JSON strings and legacy formats)
-        for team in teams_data:
-            players_value = team.get("players")
-            team["players"] = normalize_players(players_value)
-
-        return teams_data
+        return teams_data if teams_data else []
     except Exception as e:
         st.error(f"Błąd podczas pobierania składów: {e}")
         return []
@@ -0,0 +1,60 @@
+"""
+Cold-start helpers: lazy page loading and a background warm-up
+
+Page modules (and with them pandas, bcrypt, ...) are imported on first
+use. Once the database is connected, and before the first page renders,
+a background thread imports the remaining pages, opens a database
+connection, primes the active-games cache and starts the snapshot
+refresher, so the next visitors after a wake-up do not pay for it.
+"""
+
+import logging
+import importlib
+import threading
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+# page key -> (module, function)
+PAGES = {
+    'signup': ('src.pages.signup', 'signup_page'),
+    'list': ('src.pages.list_players', 'list_page'),
+    'draw': ('src.pages.draw_teams', 'draw_page'),
+    'history': ('src.pages.history', 'history_page'),
+    'stats': ('src.pages.stats', 'stats_page'),
+    'payments': ('src.pages.payments', 'payments_page'),
+    'admin': ('src.pages.admin', 'admin_page'),
+}
+
+
+def load_page(page: str):
+    """Page function, importing its module on first use"""
+    module_name, function_name = PAGES[page]
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def warm_up(db):
+    """Import all page modules, open a connection, prime the active-games cache and start the snapshot refresher"""
+    for module_name, _ in PAGES.values():
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            logger.warning(f"Rozgrzewka: nie udało się zaimportować {module_name}: {e}")
+    
+    try:
+        from src.utils.game_utils import get_active_games
+        get_active_games(db)
+    except Exception as e:
+        logger.warning(f"Rozgrzewka: nie udało się pobrać aktywnych gierek: {e}")
+    
+    # Background snapshot refresher (index and cleanup of closed games)
+    from src.utils.snapshots import start_snapshot_refresher
+    start_snapshot_refresher(db.execute_query)
+
+
+@st.cache_resource
+def start_warm_up(_db) -> threading.Thread:
+    """Run warm_up() once per server process in a background thread"""
+    thread = threading.Thread(target=warm_up, args=(_db,), name="warm-up", daemon=True)
+    thread.start()
+    return thread